@@ -1,67 +1,112 @@
 import asyncio
+import hashlib
+import json
 import os
-from typing import Annotated, List, TypedDict, Union, Optional, Any, Dict
+import time
+from typing import AsyncIterator, List, Optional, Any, Dict, Tuple, Type
 
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
-from langchain_core.tools import BaseTool
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, ToolException
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 from pydantic import create_model, Field, BaseModel
 
 # Import refactored components
-from client import RegistryRouter, MCPConnection
+from agent_state import AgentState
+from tool_scheduler import PARALLEL_TOOLS_HINT, ParallelToolNode
+from planner import PLANNER_PROMPT, PlanError, ToolPlan, describe_tools, execute_plan, transcript
+from client import HealthChecker, RegistryRouter, MCPConnectionPool, SpeculativeCheckouts, ToolMetadataCache
+from tracing import format_stats, span, tracer, waterfall
 
 # Load environment variables
 load_dotenv()
 
 # --- DYNAMIC DISPATCHER ---
 
+# Compiled arg schemas, keyed by a digest of (tool name, inputSchema). create_model is
+# by far the most expensive part of building a tool, and schemas rarely change.
+_ARGS_SCHEMA_CACHE: Dict[str, Type[BaseModel]] = {}
+_ARGS_SCHEMA_CACHE_MAX = 4096
+
+def _schema_key(name: str, input_schema: dict) -> str:
+    payload = json.dumps([name, input_schema], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def build_args_schema(metadata: Any) -> Type[BaseModel]:
+    """Compiles the pydantic model that validates a tool's arguments."""
+    # 1. Map JSON Schema types to Python types
+    type_map = {"number": float, "string": str, "integer": int, "boolean": bool}
+    
+    # 2. Build the field definitions for pydantic.create_model
+    fields = {}
+    if "properties" in metadata.inputSchema:
+        for param_name, specs in metadata.inputSchema["properties"].items():
+            py_type = type_map.get(specs.get("type"), str)
+            if specs.get("type") == "array":
+                py_type = List[type_map.get(specs.get("items", {}).get("type"), str)]
+            description = specs.get("description", "")
+            
+            required = metadata.inputSchema.get("required", [])
+            if param_name in required:
+                fields[param_name] = (py_type, Field(..., description=description))
+            else:
+                fields[param_name] = (py_type, Field(None, description=description))
+
+    # 3. Create the dynamic Pydantic model for validation
+    return create_model(f"{metadata.name}_input", **fields)
+
+def args_schema_for(metadata: Any) -> Type[BaseModel]:
+    """Returns the arg schema for a tool, compiling each distinct schema once per process."""
+    key = _schema_key(metadata.name, metadata.inputSchema)
+    schema = _ARGS_SCHEMA_CACHE.get(key)
+    if schema is None:
+        schema = build_args_schema(metadata)
+        if len(_ARGS_SCHEMA_CACHE) >= _ARGS_SCHEMA_CACHE_MAX:
+            # Dicts keep insertion order, so this drops the oldest schema
+            del _ARGS_SCHEMA_CACHE[next(iter(_ARGS_SCHEMA_CACHE))]
+        _ARGS_SCHEMA_CACHE[key] = schema
+    return schema
+
 class MCPDynamicTool(BaseTool):
     """
     A Class-based Dynamic Dispatcher for MCP Tools.
     Handles its own schema mapping and execution logic.
     """
     mcp_tool_name: str
-    mcp_session: Any
+    # Fallback only: cached graphs share tools across queries, so the live session
+    # normally arrives per run via config["configurable"]["mcp_session"].
+    mcp_session: Any = None
+    # From the server's readOnlyHint; read-only calls may be reordered and run in parallel
+    read_only: bool = False
 
     @classmethod
-    def from_mcp_metadata(cls, metadata: Any, session: Any):
+    def from_mcp_metadata(cls, metadata: Any, session: Any = None):
         """Builds a Tool instance directly from MCP metadata."""
-        # 1. Map JSON Schema types to Python types
-        type_map = {"number": float, "string": str, "integer": int, "boolean": bool}
-        
-        # 2. Build the field definitions for pydantic.create_model
-        fields = {}
-        if "properties" in metadata.inputSchema:
-            for param_name, specs in metadata.inputSchema["properties"].items():
-                py_type = type_map.get(specs.get("type"), str)
-                description = specs.get("description", "")
-                
-                required = metadata.inputSchema.get("required", [])
-                if param_name in required:
-                    fields[param_name] = (py_type, Field(..., description=description))
-                else:
-                    fields[param_name] = (py_type, Field(None, description=description))
-
-        # 3. Create the dynamic Pydantic model for validation
-        args_schema = create_model(f"{metadata.name}_input", **fields)
-        
         return cls(
             name=metadata.name,
             description=metadata.description,
-            args_schema=args_schema,
+            args_schema=args_schema_for(metadata),
             mcp_tool_name=metadata.name,
-            mcp_session=session
+            mcp_session=session,
+            read_only=bool(metadata.annotations and metadata.annotations.readOnlyHint),
         )
 
-    async def _arun(self, **kwargs: Any) -> str:
+    async def _arun(self, run_config: RunnableConfig, **kwargs: Any) -> str:
         """Dynamic async execution of the tool via MCP."""
+        session = run_config.get("configurable", {}).get("mcp_session", self.mcp_session)
+        if session is None:
+            raise RuntimeError(f"No MCP session bound for tool '{self.mcp_tool_name}'")
         print(f"[*] Dispatching to MCP Tool '{self.mcp_tool_name}' with args: {kwargs}")
-        result = await self.mcp_session.call_tool(self.mcp_tool_name, kwargs)
+        with span("call_tool", tool=self.mcp_tool_name):
+            result = await session.call_tool(self.mcp_tool_name, kwargs)
         res_text = str(result.content[0].text)
         print(f"[*] Tool '{self.mcp_tool_name}' returned: {res_text}")
+        if result.isError:
+            # Lets the tool schedulers mark the call failed and skip calls that depend on it
+            raise ToolException(res_text)
         return res_text
 
     def _run(self, **kwargs: Any) -> str:
@@ -70,37 +115,87 @@ class MCPDynamicTool(BaseTool):
 
 # --- LANGGRAPH AGENT ---
 
-class AgentState(TypedDict):
-    """The state of the graph."""
-    messages: Annotated[List[BaseMessage], lambda x, y: x + y]
+_default_llm: Optional[BaseChatModel] = None
+
+def default_llm() -> BaseChatModel:
+    """One shared OpenAI client for every agent that is not given its own."""
+    global _default_llm
+    if _default_llm is None:
+        _default_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    return _default_llm
+
+def _tool_set_hash(tools_metadata) -> str:
+    keys = sorted(
+        f"{t.name}:{t.description}:{_schema_key(t.name, t.inputSchema)}:{t.annotations}"
+        for t in tools_metadata
+    )
+    return hashlib.sha256("\n".join(keys).encode()).hexdigest()
 
 class UniversalMCPAgent:
     """Orchestrated LangGraph agent that works with any routed MCP session."""
-    def __init__(self, mcp_session, system_instruction: str, tools_metadata):
+    # Compiled graphs keyed by (server name, tool-set hash, instruction hash, llm). Tools
+    # and graphs hold no session, so a cached graph serves every query for that server.
+    _graph_cache: Dict[Tuple[str, str, str, int], Tuple[List[BaseTool], Any]] = {}
+    _GRAPH_CACHE_MAX = 64
+    # "graph": one LLM round-trip per tool step. "plan": the LLM plans every tool call
+    # up front, they run locally as a DAG, and one more LLM call writes the answer.
+    EXECUTION_MODES = ("graph", "plan")
+
+    def __init__(
+        self,
+        mcp_session,
+        system_instruction: str,
+        tools_metadata,
+        server_name: str = "",
+        llm: Optional[BaseChatModel] = None,
+        execution_mode: str = "graph",
+    ):
+        if execution_mode not in self.EXECUTION_MODES:
+            raise ValueError(
+                f"Unknown execution mode '{execution_mode}', expected one of {self.EXECUTION_MODES}"
+            )
         self.mcp_session = mcp_session
         self.system_instruction = system_instruction
-        self.tools = self._build_tools(tools_metadata)
-        self.graph = self._build_graph()
+        self.llm = llm or default_llm()
+        self.execution_mode = execution_mode
+        key = (
+            server_name,
+            _tool_set_hash(tools_metadata),
+            hashlib.sha256(system_instruction.encode()).hexdigest(),
+            # The cached graph holds the llm, so its id cannot be reused while cached
+            id(self.llm),
+        )
+        cached = self._graph_cache.get(key)
+        if cached is None:
+            self.tools = self._build_tools(tools_metadata)
+            self.graph = self._build_graph()
+            if len(self._graph_cache) >= self._GRAPH_CACHE_MAX:
+                del self._graph_cache[next(iter(self._graph_cache))]
+            self._graph_cache[key] = (self.tools, self.graph)
+        else:
+            self.tools, self.graph = cached
 
     def _build_tools(self, tools_metadata):
         """Cleanly constructs tools using the Dynamic Dispatcher Class."""
-        data = [
-            MCPDynamicTool.from_mcp_metadata(t, self.mcp_session) 
-            for t in tools_metadata
-        ]
+        data = [MCPDynamicTool.from_mcp_metadata(t) for t in tools_metadata]
         print(f"[*] tools_meta   = {data} \n")
         return data
 
     def _build_graph(self):
-        # Force sequential execution by disabling parallel tool calls
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0).bind_tools(
+        # Independent tool calls are batched; ParallelToolNode orders the dependent ones
+        llm = self.llm.bind_tools(
             self.tools, 
-            parallel_tool_calls=False
+            parallel_tool_calls=True
         )
+        # Captured by value so the cached graph does not keep this agent (or its session) alive
+        system_instruction = f"{self.system_instruction}\n\n{PARALLEL_TOOLS_HINT}"
+        read_only = [t.name for t in self.tools if t.read_only]
 
-        def call_model(state: AgentState):
-            messages = [("system", self.system_instruction)] + state["messages"]
-            response = llm.invoke(messages)
+        async def call_model(state: AgentState):
+            messages = [("system", system_instruction), *state["messages"]]
+            # ainvoke keeps the event loop free for other conversations and keepalives
+            with span("call_model"):
+                response = await llm.ainvoke(messages)
             return {"messages": [response]}
 
         def should_continue(state: AgentState):
@@ -111,58 +206,333 @@ class UniversalMCPAgent:
 
         workflow = StateGraph(AgentState)
         workflow.add_node("agent", call_model)
-        workflow.add_node("tools", ToolNode(self.tools))
+        workflow.add_node("tools", ParallelToolNode(self.tools, read_only=read_only))
         workflow.set_entry_point("agent")
         workflow.add_conditional_edges("agent", should_continue)
         workflow.add_edge("tools", "agent")
         return workflow.compile()
 
-    async def chat(self, user_input: str):
+    async def events(
+        self, user_input: str, stream_tokens: bool = False, started_at: Optional[float] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Runs the agent on one request, yielding progress as it happens:
+        {"type": "plan"}, {"type": "tool_call"}, {"type": "tool_result"} and finally {"type": "answer"}.
+        With stream_tokens, model text also arrives as {"type": "token"} events while it is
+        generated, and the answer event carries ttft_s: seconds from started_at (default:
+        now) to the first token.
+        """
+        started_at = time.perf_counter() if started_at is None else started_at
+        first_token_at = None
+        config = {"configurable": {"mcp_session": self.mcp_session}}
+        if self.execution_mode == "plan":
+            answered = False
+            async for event in self._plan_events(user_input, config, stream_tokens):
+                if event["type"] == "token" and first_token_at is None:
+                    first_token_at = time.perf_counter()
+                if event["type"] == "answer":
+                    answered = True
+                    event = self._with_ttft(event, stream_tokens, started_at, first_token_at)
+                yield event
+            if answered:
+                return
+            print("[!] Plan was unusable, falling back to step-by-step execution")
+
         inputs = {"messages": [HumanMessage(content=user_input)]}
-        async for output in self.graph.astream(inputs, stream_mode="values"):
-            message = output["messages"][-1]
-            
-            # Message check: Skip messages without content or those that are interim tool calls
-            is_tool_call = hasattr(message, "tool_calls") and message.tool_calls
-            if not is_tool_call and not isinstance(message, ToolMessage) and message.content:
-                if message != inputs["messages"][0]: 
-                    print(f"\nAgent Output: {message.content}")
+        stream_mode = ["updates", "messages"] if stream_tokens else ["updates"]
+        async for mode, payload in self.graph.astream(inputs, config=config, stream_mode=stream_mode):
+            if mode == "messages":
+                chunk, metadata = payload
+                if metadata.get("langgraph_node") == "agent" and isinstance(chunk.content, str) and chunk.content:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    yield {"type": "token", "content": chunk.content}
+                continue
+            for output in payload.values():
+                for message in output["messages"]:
+                    if isinstance(message, ToolMessage):
+                        yield {"type": "tool_result", "name": message.name,
+                               "content": message.content, "status": message.status}
+                    elif message.tool_calls:
+                        for call in message.tool_calls:
+                            yield {"type": "tool_call", "name": call["name"], "args": call["args"]}
+                    elif message.content:
+                        # The graph only ends on a model reply without tool calls
+                        yield self._with_ttft(
+                            {"type": "answer", "content": message.content},
+                            stream_tokens, started_at, first_token_at,
+                        )
+
+    @staticmethod
+    def _with_ttft(event: dict, stream_tokens: bool, started_at: float, first_token_at: Optional[float]) -> dict:
+        if stream_tokens and first_token_at is not None:
+            event["ttft_s"] = round(first_token_at - started_at, 4)
+        return event
+
+    async def ask(self, user_input: str) -> Optional[str]:
+        """Runs the agent on one request and returns its final answer."""
+        answer = None
+        async for event in self.events(user_input):
+            if event["type"] == "answer":
+                answer = event["content"]
+        return answer
+
+    async def chat(self, user_input: str):
+        """Prints the answer token by token as the model produces it."""
+        await print_events(self.events(user_input, stream_tokens=True))
+
+    async def _plan_events(self, user_input: str, config: dict, stream_tokens: bool = False) -> AsyncIterator[dict]:
+        """Plans all tool calls in one LLM call, runs them locally, then answers in one more."""
+        planner = self.llm.with_structured_output(ToolPlan, method="function_calling")
+        try:
+            with span("plan"):
+                plan = await planner.ainvoke([
+                    ("system", PLANNER_PROMPT.format(tools=describe_tools(self.tools))),
+                    ("user", user_input),
+                ])
+            if plan is None:
+                raise PlanError("Planner did not return a plan")
+            print(f"[*] Plan: {[(s.id, s.tool, s.args) for s in plan.steps]}")
+            yield {"type": "plan", "steps": [s.model_dump() for s in plan.steps]}
+            outcomes = await execute_plan(plan, self.tools, config)
+        except ValueError as e:
+            # PlanError, and planner replies that do not parse as a ToolPlan
+            print(f"[!] Planning failed: {e}")
+            return
+
+        for step in plan.steps:
+            yield {"type": "tool_result", "name": step.tool, "step": step.id,
+                   "content": outcomes[step.id]["result"]}
+        messages = [
+            ("system", self.system_instruction),
+            HumanMessage(content=user_input),
+            *transcript(plan, outcomes),
+        ]
+        if not stream_tokens:
+            with span("call_model"):
+                response = await self.llm.ainvoke(messages)
+            yield {"type": "answer", "content": response.content}
+            return
+        answer = []
+        async for chunk in self.llm.astream(messages):
+            if isinstance(chunk.content, str) and chunk.content:
+                answer.append(chunk.content)
+                yield {"type": "token", "content": chunk.content}
+        yield {"type": "answer", "content": "".join(answer)}
+
+# --- QUERY EXECUTION ---
+
+# How long a query may spend connecting to route candidates before giving up
+FAILOVER_BUDGET_S = 10.0
+
+class NoServerAvailable(RuntimeError):
+    """No route candidate could be connected to within the failover budget."""
+
+async def stream_query(
+    query: str,
+    router: RegistryRouter,
+    pool: MCPConnectionPool,
+    execution_mode: str = "graph",
+    stream_tokens: bool = False,
+    llm: Optional[BaseChatModel] = None,
+    failover_budget: float = FAILOVER_BUDGET_S,
+    speculate: int = 0,
+) -> AsyncIterator[dict]:
+    """
+    Routes a query and answers it over a pooled session, yielding the route and agent
+    events. With stream_tokens, the answer's ttft_s counts from the start of routing.
+    Each query is recorded as one trace; the route event carries its trace_id.
+
+    If a candidate cannot be connected to, the next one is tried (a "failover" event)
+    until one connects (a "connected" event) or failover_budget seconds have passed;
+    each attempt gets an even share of the budget that is left.
+    Once the agent has started, errors are not retried: tool calls may have side effects.
+
+    With speculate > 0, connections to that many likely servers (router.likely()) are
+    opened while routing runs, overlapping the route's LLM call with the SSE handshake.
+    """
+    started_at = time.perf_counter()
+    deadline = time.monotonic() + failover_budget
+    with tracer.trace("query", query=query, execution_mode=execution_mode) as trace:
+        guesses = router.likely(query, speculate) if speculate > 0 else []
+        speculation = SpeculativeCheckouts(pool, guesses)
+        try:
+            decision = await router.route(query)
+            candidates = decision.candidates or (
+                ((decision.server, decision.score),) if decision.server else ()
+            )
+            # Wrong guesses give their connections back as soon as the route is known
+            await speculation.release(keep=[s["url"] for s, _ in candidates])
+            yield {
+                "type": "route",
+                "server": decision.server["name"] if decision.server else None,
+                "path": decision.path,
+                "score": decision.score,
+                "candidates": [{"server": s["name"], "score": score} for s, score in candidates],
+                "speculated": [s["name"] for s in guesses],
+                "trace_id": trace.trace_id,
+            }
+            if decision.server is None:
+                return
+
+            failures, served_rank = [], None
+            for rank, (server, _) in enumerate(candidates):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    failures.append(f"{server['name']}: not tried, failover budget of {failover_budget}s used up")
+                    break
+                try:
+                    # An even share of what is left, so one hanging server cannot use up the budget
+                    async with asyncio.timeout(remaining / (len(candidates) - rank)):
+                        mcp = await speculation.checkout(server)
+                        try:
+                            tools_meta, instruction = await mcp.get_tools_and_instructions()
+                        except BaseException:
+                            await pool.checkin(mcp, discard=True)
+                            raise
+                except Exception as e:
+                    failures.append(f"{server['name']}: {describe_error(e)}")
+                    yield {"type": "failover", "server": server["name"], "rank": rank, "error": describe_error(e)}
+                    continue
+                served_rank = rank
+                break
+            if served_rank is None:
+                raise NoServerAvailable("; ".join(failures))
+        finally:
+            await speculation.release()
+
+        trace.attributes["server"] = server["name"]
+        try:
+            # Inside the try: a consumer that stops reading here must still return the session
+            yield {"type": "connected", "server": server["name"], "rank": served_rank}
+            agent = UniversalMCPAgent(
+                mcp.session, instruction, tools_meta, server["name"],
+                llm=llm, execution_mode=execution_mode,
+            )
+            async for event in agent.events(query, stream_tokens, started_at):
+                yield event
+        except BaseException:
+            # A failed query may have left the session mid-request; start fresh next time.
+            await pool.checkin(mcp, discard=True)
+            raise
+        await pool.checkin(mcp)
+
+async def print_events(events: AsyncIterator[dict]):
+    """Prints query events for the terminal, streaming answer tokens as they arrive."""
+    streaming = False
+    async for event in events:
+        kind = event["type"]
+        if kind == "route":
+            if event["server"] is None:
+                print("[!] Router: No suitable server found in registry for this task.")
+                continue
+            print(f"[*] Router selected: {event['server']} via {event['path']}")
+            if len(event["candidates"]) > 1:
+                print(f"[*] Fallbacks: {', '.join(c['server'] for c in event['candidates'][1:])}")
+        elif kind == "failover":
+            print(f"[!] {event['server']} is unreachable ({event['error']})")
+        elif kind == "connected" and event["rank"] > 0:
+            print(f"[*] Failed over to {event['server']}")
+        elif kind == "token":
+            if not streaming:
+                print("\nAgent Output: ", end="")
+                streaming = True
+            print(event["content"], end="", flush=True)
+        elif kind == "answer":
+            if streaming:
+                print()
+            else:
+                print(f"\nAgent Output: {event['content']}")
+            if "ttft_s" in event:
+                print(f"[*] Time to first token: {event['ttft_s']:.3f}s")
+
+def describe_error(e: BaseException) -> str:
+    # Transport failures arrive wrapped in anyio task-group ExceptionGroups
+    while isinstance(e, BaseExceptionGroup) and len(e.exceptions) == 1:
+        e = e.exceptions[0]
+    return f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+async def run_query(
+    query: str,
+    router: RegistryRouter,
+    pool: MCPConnectionPool,
+    execution_mode: str = "graph",
+    llm: Optional[BaseChatModel] = None,
+    failover_budget: float = FAILOVER_BUDGET_S,
+    speculate: int = 0,
+) -> dict:
+    """
+    Routes a query, answers it over a pooled session and returns a JSON-serializable record.
+    "server" and "rank" record which route candidate served it; "failovers" the ones that failed.
+    """
+    start = time.perf_counter()
+    record = {"query": query, "status": "no_route", "server": None, "rank": None, "route": None,
+              "candidates": [], "failovers": [], "answer": None, "error": None, "trace_id": None}
+    try:
+        async for event in stream_query(
+            query, router, pool, execution_mode, llm=llm, failover_budget=failover_budget, speculate=speculate,
+        ):
+            if event["type"] == "route":
+                record["route"] = event["path"]
+                record["candidates"] = [c["server"] for c in event["candidates"]]
+                record["trace_id"] = event["trace_id"]
+                if event["server"] is not None:
+                    record["status"] = "ok"
+            elif event["type"] == "failover":
+                record["failovers"].append({"server": event["server"], "error": event["error"]})
+            elif event["type"] == "connected":
+                record["server"] = event["server"]
+                record["rank"] = event["rank"]
+            elif event["type"] == "answer":
+                record["answer"] = event["content"]
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = describe_error(e)
+    record["latency_s"] = round(time.perf_counter() - start, 4)
+    return record
 
 # --- MAIN EXECUTION ---
 
 async def main():
-    router = RegistryRouter("servers.json")
+    health = HealthChecker()
+    router = RegistryRouter("servers.json", mode=os.getenv("ROUTER_MODE", "llm"), health=health)
+    execution_mode = os.getenv("EXECUTION_MODE", "graph")
+    # SPECULATE=N starts connecting to the N most likely servers while the router decides
+    speculate = int(os.getenv("SPECULATE", "0"))
+    # TRACE=1 prints a per-query waterfall; TRACE_PATH appends every trace to a JSONL file
+    show_trace = bool(os.getenv("TRACE"))
+    tracer.jsonl_path = os.getenv("TRACE_PATH")
     
     print("\n" + "="*50)
     print("SCALABLE MCP ROUTING AGENT")
     print("="*50)
 
-    while True:
-        query = input("\nWhat is your request? (or 'exit'): ")
-        if query.lower() in ["exit", "quit"]:
-            break
-
-        print(f"[*] Routing query to registry...")
-        target_server = await router.route_query(query)
-        
-        if not target_server:
-            print("[!] Router: No suitable server found in registry for this task.")
-            continue
-            
-        print(f"[*] Router selected: {target_server['name']} ({target_server['url']})")
+    # Tool lists rarely change; persisting them lets a fresh process skip list_tools/get_prompt
+    metadata_cache = ToolMetadataCache(persist_path=".mcp_metadata_cache.json")
 
-        try:
-            async with MCPConnection(target_server["url"]) as mcp:
-                tools_meta, instruction = await mcp.get_tools_and_instructions()
-                
-                print(f"[*] Initializing Dynamic Agent for session...")
-                agent = UniversalMCPAgent(mcp.session, instruction, tools_meta)
-                
-                await agent.chat(query)
-                
-        except Exception as e:
-            print(f"\n[!] Final Result: Could not complete task because the selected server is currently unreachable.")
-            print(f"    (Error: {e})")
+    async with health.monitor(router.urls), \
+            MCPConnectionPool(metadata_cache=metadata_cache, health=health) as pool:
+        while True:
+            # Read input off the event loop so pooled sessions keep being serviced
+            query = await asyncio.to_thread(input, "\nWhat is your request? (or 'exit'): ")
+            if query.lower() in ["exit", "quit"]:
+                break
+
+            print(f"[*] Routing query to registry...")
+            try:
+                await print_events(stream_query(
+                    query, router, pool, execution_mode, stream_tokens=True, speculate=speculate,
+                ))
+            except NoServerAvailable as e:
+                print(f"\n[!] Final Result: Could not complete task because no candidate server is reachable.")
+                print(f"    (Errors: {e})")
+            except Exception as e:
+                print(f"\n[!] Final Result: Could not complete task: {describe_error(e)}")
+            if show_trace:
+                print(f"\n{waterfall(tracer.traces[-1].to_dict())}")
+
+    if show_trace and tracer.traces:
+        print(f"\n{format_stats(tracer.stats())}")
 
 if __name__ == "__main__":
     try:
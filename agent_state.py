@@ -0,0 +1,64 @@
+"""Graph state shared by the MCP agent and the local agent."""
+from itertools import islice
+from typing import Annotated, Iterable, Iterator, List, Sequence, TypedDict
+
+from langchain_core.messages import BaseMessage
+
+class MessageLog(Sequence[BaseMessage]):
+    """
+    Append-only message history.
+    A log shares its backing list with the log it was extended from, so appending is
+    amortized O(1) instead of copying the whole history on every graph step. Logs
+    never change once created, so values already streamed by the graph stay valid.
+    """
+    __slots__ = ("_items", "_length")
+
+    def __init__(self, messages: Iterable[BaseMessage] = ()):
+        self._items = list(messages)
+        self._length = len(self._items)
+
+    def extend(self, messages: Iterable[BaseMessage]) -> "MessageLog":
+        """Returns a new log with the messages appended; this log is unchanged."""
+        if len(self._items) == self._length:
+            items = self._items  # we are the newest view, grow the shared list
+        else:
+            items = self._items[:self._length]  # a newer log already branched off here
+        items.extend(messages)
+        log = MessageLog.__new__(MessageLog)
+        log._items = items
+        log._length = len(items)
+        return log
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._items[i] for i in range(self._length)[index]]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("MessageLog index out of range")
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[BaseMessage]:
+        return islice(self._items, self._length)
+
+    def __add__(self, other: Iterable[BaseMessage]) -> List[BaseMessage]:
+        return [*self, *other]
+
+    def __radd__(self, other: Iterable[BaseMessage]) -> List[BaseMessage]:
+        return [*other, *self]
+
+    def __repr__(self) -> str:
+        return f"MessageLog({list(self)!r})"
+
+def append_messages(left: Sequence[BaseMessage], right: Iterable[BaseMessage]) -> MessageLog:
+    """State reducer: appends a node's new messages without copying the history."""
+    if not isinstance(left, MessageLog):
+        left = MessageLog(left)
+    return left.extend(right)
+
+class AgentState(TypedDict):
+    """The state of the graph."""
+    messages: Annotated[List[BaseMessage], append_messages]
@@ -1,13 +1,16 @@
 import asyncio
-import os
-from typing import Annotated, List, TypedDict, Union
+from typing import Optional
 
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage, ToolMessage
 from langchain_core.tools import tool
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
+
+from agent_state import AgentState
+from tool_scheduler import PARALLEL_TOOLS_HINT, ParallelToolNode
+from tracing import span
 
 # Load environment variables
 load_dotenv()
@@ -42,34 +45,34 @@ def divide(a: float, b: float) -> float:
 
 # --- LANGGRAPH AGENT ---
 
-class AgentState(TypedDict):
-    """The state of the graph."""
-    messages: Annotated[List[BaseMessage], lambda x, y: x + y]
-
 class LocalMathAgent:
     """
     Orchestrated LangGraph agent using LOCAL tools.
-    Exact same graph logic as the MCP version, but without the network overhead.
+    Exact same graph logic as the MCP version, but without the network overhead
+    (benchmarks/end_to_end.py measures that overhead).
     """
-    def __init__(self):
+    def __init__(self, llm: Optional[BaseChatModel] = None):
         self.tools = [add, subtract, multiply, divide]
+        self.llm = llm or ChatOpenAI(model="gpt-4o-mini", temperature=0)
         self.graph = self._build_graph()
 
     def _build_graph(self):
-        # Using the same model and sequential constraint
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0).bind_tools(
+        # Same model and tool scheduling as the MCP version
+        llm = self.llm.bind_tools(
             self.tools, 
-            parallel_tool_calls=False
+            parallel_tool_calls=True
         )
 
-        def call_model(state: AgentState):
+        async def call_model(state: AgentState):
             system_instruction = (
                 "You are a helpful mathematical assistant. "
-                "IMPORTANT: You must perform calculations STEP-BY-STEP. "
-                "Wait for the result of one tool call before starting the next."
+                "Use the tools for every calculation and build the final answer from their results. "
+                f"{PARALLEL_TOOLS_HINT}"
             )
-            messages = [("system", system_instruction)] + state["messages"]
-            response = llm.invoke(messages)
+            messages = [("system", system_instruction), *state["messages"]]
+            # ainvoke keeps the event loop free for other conversations and keepalives
+            with span("call_model"):
+                response = await llm.ainvoke(messages)
             return {"messages": [response]}
 
         def should_continue(state: AgentState):
@@ -80,7 +83,8 @@ class LocalMathAgent:
 
         workflow = StateGraph(AgentState)
         workflow.add_node("agent", call_model)
-        workflow.add_node("tools", ToolNode(self.tools))
+        # The arithmetic tools are pure, so only '$n' references order them
+        workflow.add_node("tools", ParallelToolNode(self.tools, read_only=[t.name for t in self.tools]))
         workflow.set_entry_point("agent")
         workflow.add_conditional_edges("agent", should_continue)
         workflow.add_edge("tools", "agent")
@@ -0,0 +1,140 @@
+"""
+Offline batch runner: answers every query in a JSONL file with bounded concurrency.
+
+Each input line is {"request_id": ..., "query": ...}. Results are appended to the
+output JSONL as they finish, so a crashed run can be restarted with the same
+arguments and only the unfinished requests (and those that errored) are re-run.
+
+    uv run python batch.py requests.jsonl results.jsonl --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+from typing import Iterator, Optional, Set, Tuple
+
+from agent import run_query
+from client import HealthChecker, MCPConnectionPool, RegistryRouter, ToolMetadataCache
+from tracing import format_stats, tracer
+
+def completed_ids(output_path: str) -> Set[str]:
+    """Request ids already answered in a previous run; errored ones are retried."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by the crash we are resuming from
+            if record.get("status") != "error" and "request_id" in record:
+                done.add(str(record["request_id"]))
+    return done
+
+def _terminate_partial_line(output_path: str):
+    """Ends a line cut short by a crash so new records do not get glued onto it."""
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return
+    with open(output_path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+def read_requests(input_path: str, skip: Set[str]) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Streams (request_id, query, error) triples; lines without an id are numbered by position.
+    A line that is not a request object comes back with query None and the reason in error.
+    """
+    with open(input_path, "r") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                request, error = {}, f"Invalid JSON on line {line_no}: {e.msg}"
+            else:
+                if not isinstance(request, dict):
+                    request, error = {}, f"Line {line_no} is not a JSON object"
+                elif not isinstance(request.get("query"), str):
+                    error = f"Line {line_no} has no 'query' string"
+                else:
+                    error = None
+            request_id = str(request.get("request_id", line_no))
+            if request_id not in skip:
+                yield request_id, None if error else request["query"], error
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = 8,
+    router_mode: str = "llm",
+    execution_mode: str = "graph",
+    registry_path: str = "servers.json",
+    trace_path: Optional[str] = None,
+    speculate: int = 0,
+):
+    skip = completed_ids(output_path)
+    if skip:
+        print(f"[*] Resuming: {len(skip)} request(s) already completed in {output_path}")
+    _terminate_partial_line(output_path)
+
+    tracer.jsonl_path = trace_path
+    health = HealthChecker()
+    router = RegistryRouter(registry_path, mode=router_mode, health=health)
+    metadata_cache = ToolMetadataCache(persist_path=".mcp_metadata_cache.json")
+    # A small queue keeps memory flat however large the input file is
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    counts = {"ok": 0, "no_route": 0, "error": 0}
+
+    async with health.monitor(router.urls), \
+            MCPConnectionPool(max_per_url=concurrency, metadata_cache=metadata_cache, health=health) as pool:
+        with open(output_path, "a") as out:
+            async def worker():
+                while (item := await queue.get()) is not None:
+                    request_id, query, error = item
+                    if error is not None:
+                        record = {"request_id": request_id, "status": "error", "error": error}
+                    else:
+                        record = {"request_id": request_id, **await run_query(
+                            query, router, pool, execution_mode, speculate=speculate,
+                        )}
+                    counts[record["status"]] += 1
+                    # One line per result, flushed at once, so a crash loses only in-flight work
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+
+            # If a worker dies (e.g. the disk fills up), the group cancels the feeder too
+            async with asyncio.TaskGroup() as workers:
+                for _ in range(concurrency):
+                    workers.create_task(worker())
+                for item in read_requests(input_path, skip):
+                    await queue.put(item)
+                for _ in range(concurrency):
+                    await queue.put(None)
+
+    print(f"[*] Batch finished: {counts}")
+    if tracer.traces:
+        print(f"\n{format_stats(tracer.stats())}")
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="JSONL file of {'request_id', 'query'} objects")
+    parser.add_argument("output", help="JSONL file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--router-mode", default=os.getenv("ROUTER_MODE", "llm"))
+    parser.add_argument("--execution-mode", default=os.getenv("EXECUTION_MODE", "graph"))
+    parser.add_argument("--registry", default="servers.json")
+    parser.add_argument("--trace", help="JSONL file each query's trace is appended to")
+    parser.add_argument("--speculate", type=int, default=int(os.getenv("SPECULATE", "0")),
+                        help="connect to this many likely servers while routing")
+    args = parser.parse_args()
+    asyncio.run(run_batch(
+        args.input, args.output, args.concurrency, args.router_mode, args.execution_mode,
+        args.registry, args.trace, args.speculate,
+    ))
+
+if __name__ == "__main__":
+    main()
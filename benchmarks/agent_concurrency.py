@@ -0,0 +1,45 @@
+"""
+Throughput of concurrent conversations with blocking vs non-blocking LLM calls.
+
+Runs LocalMathAgent conversations concurrently in one event loop against a fake LLM
+with a fixed per-call latency. "blocking" reproduces the old synchronous
+llm.invoke() inside call_model; "async" is the current ainvoke() path.
+
+    uv run python -m benchmarks.agent_concurrency
+"""
+import asyncio
+import contextlib
+import io
+import time
+
+from agent_without_mcp import LocalMathAgent
+from benchmarks.fakes import ScriptedMathLLM
+
+LATENCY = 0.05           # seconds per simulated OpenAI round-trip
+CONCURRENCY = (1, 8, 32)
+CONVERSATIONS = 64
+
+async def run(blocking: bool, concurrency: int) -> float:
+    agent = LocalMathAgent(llm=ScriptedMathLLM(latency=LATENCY, blocking=blocking))
+    limit = asyncio.Semaphore(concurrency)
+
+    async def conversation(i: int):
+        async with limit:
+            await agent.chat(f"add {i} and {i + 1}")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(conversation(i) for i in range(CONVERSATIONS)))
+    return CONVERSATIONS / (time.perf_counter() - start)
+
+async def main():
+    print(f"{CONVERSATIONS} conversations, 2 LLM calls each, {LATENCY * 1000:.0f} ms per call\n")
+    print(f"{'concurrency':>11} | {'blocking conv/s':>15} | {'async conv/s':>12} | {'gain':>6}")
+    print("-" * 54)
+    for concurrency in CONCURRENCY:
+        blocking = await run(True, concurrency)
+        non_blocking = await run(False, concurrency)
+        print(f"{concurrency:>11} | {blocking:>15.1f} | {non_blocking:>12.1f} | {non_blocking / blocking:>5.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+Element-wise arithmetic over HTTP: scalar GET /divide per element vs POST /batch/divide.
+
+Runs against a local server.py (started on port 8000 unless one is already listening
+there). The scalar side sends one request per element over a keep-alive connection
+pool at CONCURRENCY; the batch side sends every element in one request. Every 100th
+divisor is zero, so both sides also exercise the per-element error path. The batch
+client encodes and decodes with pydantic's JSON codec, as the server does; with the
+standard json module, the client's own encoding takes longer than the server's work.
+
+    uv run python -m benchmarks.batch_arithmetic
+"""
+import asyncio
+import logging
+import random
+import statistics
+import time
+
+import httpx
+from pydantic_core import from_json, to_json
+
+from benchmarks.end_to_end import SERVER_URL, local_server
+from server import do_batch, do_divide
+
+SCALAR_ELEMENTS = 2_000
+BATCH_ELEMENTS = (2_000, 100_000, 1_000_000)
+CONCURRENCY = 32
+REPEATS = 3
+
+def operands(n: int):
+    rng = random.Random(0)
+    a = [rng.uniform(-1e3, 1e3) for _ in range(n)]
+    b = [0.0 if i % 100 == 0 else rng.uniform(-1e3, 1e3) for i in range(n)]
+    return a, b
+
+async def scalar(client: httpx.AsyncClient, a, b) -> float:
+    limit = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(x: float, y: float):
+        async with limit:
+            response = await client.get(f"{SERVER_URL}/divide", params={"a": x, "b": y})
+            assert response.status_code in (200, 400)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(x, y) for x, y in zip(a, b)))
+    return time.perf_counter() - start
+
+async def batch(client: httpx.AsyncClient, a, b) -> float:
+    start = time.perf_counter()
+    response = await client.post(
+        f"{SERVER_URL}/batch/divide", content=to_json({"a": a, "b": b}),
+        headers={"content-type": "application/json"},
+    )
+    response.raise_for_status()
+    assert len(from_json(response.content)["errors"]) == len(b) // 100
+    return time.perf_counter() - start
+
+def in_process(a, b) -> tuple:
+    """The same work without HTTP: a Python loop over do_divide vs one do_batch call."""
+    start = time.perf_counter()
+    for x, y in zip(a, b):
+        try:
+            do_divide(x, y)
+        except ValueError:
+            pass
+    loop_s = time.perf_counter() - start
+    start = time.perf_counter()
+    do_batch("divide", a, b)
+    return loop_s, time.perf_counter() - start
+
+async def main():
+    # server.py's MCP setup turns on INFO logging, which would log every scalar request
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    rows = []
+    with local_server():
+        limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+        async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+            a, b = operands(SCALAR_ELEMENTS)
+            await scalar(client, a[:100], b[:100])  # warm-up: open the pooled connections
+            elapsed = statistics.median([await scalar(client, a, b) for _ in range(REPEATS)])
+            rows.append(("scalar GET", SCALAR_ELEMENTS, SCALAR_ELEMENTS, elapsed))
+            for n in BATCH_ELEMENTS:
+                a, b = operands(n)
+                elapsed = statistics.median([await batch(client, a, b) for _ in range(REPEATS)])
+                rows.append(("batch POST", n, 1, elapsed))
+
+    scalar_rate = rows[0][1] / rows[0][3]
+    print(f"divide over HTTP, scalar requests at concurrency {CONCURRENCY}, median of {REPEATS} runs\n")
+    print(f"{'endpoint':<10} | {'elements':>9} | {'requests':>8} | {'seconds':>8} | {'elements/s':>11} | {'speedup':>7}")
+    print("-" * 70)
+    for name, n, requests, elapsed in rows:
+        rate = n / elapsed
+        print(f"{name:<10} | {n:>9,} | {requests:>8,} | {elapsed:>8.3f} | {rate:>11,.0f} | {rate / scalar_rate:>6.0f}x")
+
+    a, b = operands(BATCH_ELEMENTS[-1])
+    loop_s, batch_s = in_process(a, b)
+    print(f"\nIn process, {len(a):,} elements: do_divide loop {loop_s * 1000:.0f} ms, do_batch {batch_s * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
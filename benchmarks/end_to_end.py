@@ -0,0 +1,144 @@
+"""
+End-to-end cost of the MCP architecture: agent.py vs agent_without_mcp.py.
+
+Both agents answer the same arithmetic corpus with the same deterministic fake LLM
+(LATENCY per call). The MCP side goes through the full pipeline: LLM routing (a
+fake that always names MathServer), a pooled SSE session to a local server.py, tool
+metadata and tool calls over MCP. The local side calls the same functions in-process.
+server.py is started on port 8000 unless one is already listening there.
+
+Reports throughput and latency percentiles at several concurrency levels, tool and
+LLM calls per query, and the mean time per query spent in each traced stage.
+
+    uv run python -m benchmarks.end_to_end
+"""
+import asyncio
+import contextlib
+import io
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+from langchain_core.messages import HumanMessage, ToolMessage
+
+from agent import stream_query
+from agent_without_mcp import LocalMathAgent
+from benchmarks.fakes import FixedReplyLLM, ScriptedMathLLM
+from client import MCPConnectionPool, RegistryRouter, ToolMetadataCache
+from routing import RouteCache
+from tracing import stage_stats, tracer
+
+LATENCY = 0.02          # seconds per simulated OpenAI round-trip
+CONCURRENCY = (1, 8, 32)
+QUERIES = 64
+SERVER_URL = "http://127.0.0.1:8000"
+CORPUS = [
+    f"{op} {a} and {b}"
+    for op, a, b in [
+        ("add", 12, 30), ("subtract", 100, 58), ("multiply", 6, 7), ("divide", 84, 2),
+        ("add", 0.5, 41.5), ("subtract", -8, -50), ("multiply", 1.5, 28), ("divide", 126, 3),
+    ]
+]
+
+def server_is_up() -> bool:
+    try:
+        with urllib.request.urlopen(f"{SERVER_URL}/add?a=1&b=1", timeout=1):
+            return True
+    except OSError:
+        return False
+
+@contextlib.contextmanager
+def local_server():
+    """Starts server.py for the duration of the benchmark unless it is already running."""
+    if server_is_up():
+        yield
+        return
+    proc = subprocess.Popen([sys.executable, "server.py"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 15
+        while not server_is_up():
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("server.py did not start on port 8000")
+            time.sleep(0.1)
+        yield
+    finally:
+        proc.terminate()
+        proc.wait()
+
+async def run_local(agent: LocalMathAgent, query: str) -> int:
+    with tracer.trace("query", query=query):
+        state = await agent.graph.ainvoke({"messages": [HumanMessage(content=query)]})
+    return sum(isinstance(m, ToolMessage) for m in state["messages"])
+
+async def run_mcp(router: RegistryRouter, pool: MCPConnectionPool, llm: ScriptedMathLLM, query: str) -> int:
+    tool_calls = 0
+    async for event in stream_query(query, router, pool, llm=llm):
+        tool_calls += event["type"] == "tool_result"
+    return tool_calls
+
+async def measure(run, concurrency: int) -> Dict[str, float]:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> int:
+        async with limit:
+            return await run(CORPUS[i % len(CORPUS)])
+
+    tracer.traces.clear()
+    start = time.perf_counter()
+    tool_calls = await asyncio.gather(*(one(i) for i in range(QUERIES)))
+    elapsed = time.perf_counter() - start
+    stats = stage_stats(t.to_dict() for t in tracer.traces)
+    return {
+        "qps": QUERIES / elapsed,
+        "p50": stats["total"]["p50_ms"],
+        "p95": stats["total"]["p95_ms"],
+        "tools": sum(tool_calls) / QUERIES,
+        "llm": stats["call_model"]["count"] / QUERIES + stats.get("route", {}).get("count", 0) / QUERIES,
+        "stages": {name: s["sum_ms"] / QUERIES for name, s in stats.items()},
+    }
+
+async def main():
+    llm = ScriptedMathLLM(latency=LATENCY)
+    local = LocalMathAgent(llm=llm)
+    # No route cache: every query pays for routing, as a fresh process would
+    router = RegistryRouter(
+        "servers.json", cache=RouteCache(max_size=0), llm=FixedReplyLLM(reply="MathServer", latency=LATENCY)
+    )
+    results: Dict[str, List[Dict[str, float]]] = {"local": [], "mcp": []}
+
+    # Both agents print every step; keep the report readable
+    with local_server(), contextlib.redirect_stdout(io.StringIO()):
+        async with MCPConnectionPool(max_per_url=max(CONCURRENCY), metadata_cache=ToolMetadataCache()) as pool:
+            runners = {
+                "local": lambda q: run_local(local, q),
+                "mcp": lambda q: run_mcp(router, pool, llm, q),
+            }
+            for name, run in runners.items():
+                await measure(run, 1)  # warm-up: graph build, first connection, tool metadata
+                for concurrency in CONCURRENCY:
+                    results[name].append(await measure(run, concurrency))
+
+    print(f"{QUERIES} queries, {LATENCY * 1000:.0f} ms per LLM call\n")
+    print(f"{'agent':>5} | {'concurrency':>11} | {'q/s':>7} | {'p50 ms':>7} | {'p95 ms':>7} | {'tools/q':>7} | {'LLM/q':>5}")
+    print("-" * 69)
+    for name, rows in results.items():
+        for concurrency, r in zip(CONCURRENCY, rows):
+            print(f"{name:>5} | {concurrency:>11} | {r['qps']:>7.1f} | {r['p50']:>7.1f} | {r['p95']:>7.1f} "
+                  f"| {r['tools']:>7.1f} | {r['llm']:>5.1f}")
+
+    print("\nMean ms per query by stage (nested stages are included in their parents)\n")
+    columns = [
+        (f"local c={CONCURRENCY[0]}", results["local"][0]["stages"]),
+        (f"mcp c={CONCURRENCY[0]}", results["mcp"][0]["stages"]),
+        (f"mcp c={CONCURRENCY[-1]}", results["mcp"][-1]["stages"]),
+    ]
+    print(f"{'stage':<14} | " + " | ".join(f"{title:>10}" for title, _ in columns))
+    print("-" * (17 + 13 * len(columns)))
+    stages = sorted({s for _, col in columns for s in col}, key=lambda s: -columns[-1][1].get(s, 0))
+    for stage in stages:
+        print(f"{stage:<14} | " + " | ".join(f"{col.get(stage, 0):>10.2f}" for _, col in columns))
+
+if __name__ == "__main__":
+    asyncio.run(main())
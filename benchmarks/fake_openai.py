@@ -0,0 +1,239 @@
+"""
+Local OpenAI-compatible chat completions endpoint for offline load tests.
+
+Serves POST /v1/chat/completions (streaming and non-streaming, with tool calls) so
+the whole routing + MCP pipeline runs without an OpenAI key:
+
+    uv run python -m benchmarks.fake_openai --latency lognormal:300,0.4 --token-ms 15
+    OPENAI_BASE_URL=http://127.0.0.1:8200/v1 OPENAI_API_KEY=fake uv run python agent.py
+
+Replies come from, in order:
+  1. --script rules: a JSON list of {"match": regex, "content": str,
+     "tool_calls": [{"name": str, "arguments": {...}}]}; the first rule whose regex
+     matches the last message wins.
+  2. Built-in rules that understand this repo's prompts: the router's server list
+     (ranks servers by word stems shared with the query), the planner's
+     ToolPlan function, and "<operation> a and b" requests, answered with one tool
+     call and then "The result is <tool result>." Queries holding an expression
+     with two or more operators, like "(3 + 4) * 2", go to the evaluate tool.
+
+Latency before the first token is drawn per request from --latency (const:MS,
+uniform:LO,HI, normal:MEAN,SD or lognormal:MEDIAN,SIGMA), seeded from --seed and the
+request body so identical requests always take the same time. Streamed replies then
+send one word every --token-ms; --pad-tokens appends filler words to every text
+reply to simulate longer completions. Usage counts roughly 4 characters per token.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+from benchmarks.fakes import pick_operation
+from routing import tokenize
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_SERVER_LINE_RE = re.compile(r"^- (\w+): (.+)$", re.MULTILINE)
+_PLANNER_TOOL_RE = re.compile(r"^- (\w+)\(([^)]*)\)", re.MULTILINE)
+_EXPRESSION_RE = re.compile(r"[-(]*\d[\d.\s()+\-*/]*[\d)]")
+
+# --- LATENCY ---
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Turns "kind:params" (milliseconds) into a sampler returning seconds."""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+    samplers = {
+        "const": lambda rng, ms: ms,
+        "uniform": lambda rng, lo, hi: rng.uniform(lo, hi),
+        "normal": lambda rng, mean, sd: rng.gauss(mean, sd),
+        "lognormal": lambda rng, median, sigma: median * rng.lognormvariate(0, sigma),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution '{kind}', expected one of {list(samplers)}")
+    sample = samplers[kind]
+    sample(random.Random(0), *values)  # fail at startup on a wrong number of parameters
+    return lambda rng: max(0.0, sample(rng, *values)) / 1000
+
+# --- REPLIES ---
+
+def _text(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+def _numbers(text: str) -> List[float]:
+    return ([float(n) for n in _NUMBER_RE.findall(text)] + [0.0, 0.0])[:2]
+
+def _route(system: str, query: str) -> str:
+    """Comma-separated servers sharing word stems with the query, most shared first."""
+    # Shared 3-letter prefixes, so "multiply" matches "multiplication" and "add" "addition"
+    words = {w[:3] for w in tokenize(query)}
+    overlaps = [
+        (len(words & {w[:3] for w in tokenize(description)}), name)
+        for name, description in _SERVER_LINE_RE.findall(system)
+    ]
+    ranked = [name for overlap, name in sorted(overlaps, key=lambda o: -o[0]) if overlap > 0]
+    return ", ".join(ranked) or "None"
+
+def _tool_call(name: str, arguments: dict) -> dict:
+    return {"name": name, "arguments": arguments}
+
+def rule_reply(body: dict) -> Dict[str, Any]:
+    """Deterministic reply to this repo's router, planner and agent prompts."""
+    messages = body.get("messages", [])
+    system = "\n".join(_text(m) for m in messages if m.get("role") == "system")
+    last = messages[-1] if messages else {}
+    query = next((_text(m) for m in reversed(messages) if m.get("role") == "user"), "")
+    tools = {t["function"]["name"]: t["function"] for t in body.get("tools", [])}
+
+    if "MCP Router" in system:
+        return {"content": _route(system, query)}
+    if last.get("role") == "tool":
+        return {"content": f"The result is {_text(last)}."}
+    if "ToolPlan" in tools:
+        params = {name: [p.split(":")[0].strip() for p in args.split(",")] for name, args in _PLANNER_TOOL_RE.findall(system)}
+        op = pick_operation(query)
+        names = params.get(op, ["a", "b"])
+        step = {"id": "s1", "tool": op, "args": dict(zip(names, _numbers(query)))}
+        return {"tool_calls": [_tool_call("ToolPlan", {"steps": [step]})]}
+
+    expressions = [e.strip() for e in _EXPRESSION_RE.findall(query) if len(re.findall(r"(?<=[\d)\s])[-+*/]", e)) >= 2]
+    if expressions and "evaluate" in tools:
+        return {"tool_calls": [_tool_call("evaluate", {"expression": max(expressions, key=len)})]}
+
+    op = pick_operation(query)
+    if op in tools:
+        properties = list(tools[op].get("parameters", {}).get("properties", {}))
+        return {"tool_calls": [_tool_call(op, dict(zip(properties, _numbers(query))))]}
+    return {"content": f"You said: {query}"}
+
+class Responder:
+    """Picks a reply for a request: scripted rules first, then the built-in ones."""
+    def __init__(self, script: Optional[List[dict]] = None, pad_tokens: int = 0):
+        self.script = [(re.compile(rule["match"], re.IGNORECASE), rule) for rule in script or []]
+        self.pad_tokens = pad_tokens
+
+    def reply(self, body: dict) -> Dict[str, Any]:
+        messages = body.get("messages", [])
+        last = _text(messages[-1]) if messages else ""
+        for pattern, rule in self.script:
+            if pattern.search(last):
+                reply = {"content": rule.get("content"), "tool_calls": rule.get("tool_calls")}
+                break
+        else:
+            reply = rule_reply(body)
+        if reply.get("content") and self.pad_tokens:
+            reply["content"] += " " + " ".join(["lorem"] * self.pad_tokens)
+        return reply
+
+# --- OPENAI WIRE FORMAT ---
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def _usage(body: dict, reply: dict) -> dict:
+    prompt = _estimate_tokens(json.dumps(body.get("messages", [])))
+    completion = _estimate_tokens((reply.get("content") or "") + json.dumps(reply.get("tool_calls") or []))
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+def _wire_tool_calls(reply: dict) -> List[dict]:
+    return [
+        {"id": f"call_{uuid.uuid4().hex[:24]}", "type": "function",
+         "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])}}
+        for call in reply.get("tool_calls") or []
+    ]
+
+def completion(body: dict, reply: dict) -> dict:
+    tool_calls = _wire_tool_calls(reply)
+    message = {"role": "assistant", "content": None if tool_calls else reply.get("content") or ""}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{"index": 0, "message": message, "logprobs": None,
+                     "finish_reason": "tool_calls" if tool_calls else "stop"}],
+        "usage": _usage(body, reply),
+    }
+
+async def completion_chunks(body: dict, reply: dict, token_delay: float):
+    """Yields SSE lines in the chat.completion.chunk format, one word per content chunk."""
+    base = {"id": f"chatcmpl-{uuid.uuid4().hex}", "object": "chat.completion.chunk",
+            "created": int(time.time()), "model": body.get("model", "fake")}
+
+    def chunk(delta: dict, finish_reason: Optional[str] = None, **extra) -> str:
+        payload = {**base, "choices": [{"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish_reason}], **extra}
+        return f"data: {json.dumps(payload)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    tool_calls = _wire_tool_calls(reply)
+    for i, call in enumerate(tool_calls):
+        yield chunk({"tool_calls": [{"index": i, **call}]})
+    for i, word in enumerate((reply.get("content") or "").split() if not tool_calls else []):
+        if i:
+            await asyncio.sleep(token_delay)
+        yield chunk({"content": word if i == 0 else f" {word}"})
+    yield chunk({}, "tool_calls" if tool_calls else "stop")
+    if (body.get("stream_options") or {}).get("include_usage"):
+        yield f"data: {json.dumps({**base, 'choices': [], 'usage': _usage(body, reply)})}\n\n"
+    yield "data: [DONE]\n\n"
+
+def create_app(responder: Responder, latency: Callable[[random.Random], float], token_delay: float, seed: int) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        raw = await request.body()
+        body = json.loads(raw)
+        app.state.requests += 1
+        reply = responder.reply(body)
+        # Seeded by the request itself, so the same request always waits the same time
+        rng = random.Random(f"{seed}:{hashlib.sha256(raw).hexdigest()}")
+        await asyncio.sleep(latency(rng))
+        if body.get("stream"):
+            return StreamingResponse(completion_chunks(body, reply, token_delay), media_type="text/event-stream")
+        return JSONResponse(completion(body, reply))
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "owned_by": "fake"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": app.state.requests}
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat completions endpoint.")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--latency", default="const:0", help="time to first token in ms, e.g. normal:300,80")
+    parser.add_argument("--token-ms", type=float, default=0.0, help="delay between streamed words")
+    parser.add_argument("--pad-tokens", type=int, default=0, help="filler words appended to text replies")
+    parser.add_argument("--script", help="JSON file of scripted reply rules")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script, "r") as f:
+            script = json.load(f)
+    app = create_app(Responder(script, args.pad_tokens), parse_latency(args.latency), args.token_ms / 1000, args.seed)
+    print(f"[*] Fake OpenAI endpoint on http://127.0.0.1:{args.port}/v1 (latency {args.latency})")
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""In-process stand-ins used by the benchmarks so they run without an OpenAI key."""
+import asyncio
+import json
+import re
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_OPS = {
+    "add": ("add", "plus", "sum", "+"),
+    "subtract": ("subtract", "minus", "-"),
+    "multiply": ("multiply", "times", "product", "*"),
+    "divide": ("divide", "over", "/"),
+}
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+def pick_operation(text: str) -> str:
+    lowered = text.lower()
+    return next((op for op, words in _OPS.items() if any(w in lowered for w in words)), "add")
+
+class ScriptedMathLLM(BaseChatModel):
+    """
+    Deterministic chat model that answers "<op> a and b" prompts with one tool call
+    followed by a final answer, after a simulated network latency.
+
+    blocking=True sleeps on the event loop thread, reproducing a synchronous
+    llm.invoke() inside an async graph run. token_latency adds a delay per word of
+    the final answer; when streamed, words arrive one by one after `latency`.
+    """
+    latency: float = 0.05
+    blocking: bool = False
+    token_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-math"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage):
+            return AIMessage(content=f"The result is {last.content}.")
+        query = next(m.content for m in reversed(messages) if isinstance(m, HumanMessage))
+        a, b = ([float(n) for n in _NUMBER_RE.findall(query)] + [0.0, 0.0])[:2]
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": pick_operation(query), "args": {"a": a, "b": b}, "id": f"call_{len(messages)}"}],
+        )
+
+    def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        message = self._respond(messages)
+        await asyncio.sleep(self.token_latency * len(message.content.split()))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        message = self._respond(messages)
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[{"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}],
+            ))
+            return
+        for i, word in enumerate(message.content.split()):
+            await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else f" {word}"))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+class LoopingToolLLM(BaseChatModel):
+    """Keeps calling `add` until the history reaches `steps` messages, then answers. O(1) per call."""
+    steps: int = 1000
+
+    @property
+    def _llm_type(self) -> str:
+        return "looping-tool"
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        return self
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        if len(messages) >= self.steps:
+            return AIMessage(content="Done.")
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": "add", "args": {"a": 1.0, "b": 1.0}, "id": f"call_{len(messages)}"}],
+        )
+
+    def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+class FixedReplyLLM(BaseChatModel):
+    """Answers every prompt with the same text after a simulated latency, e.g. a router's server name."""
+    reply: str
+    latency: float = 0.05
+
+    @property
+    def _llm_type(self) -> str:
+        return "fixed-reply"
+
+    def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    async def _agenerate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+class FakeMCPSession:
+    """Answers call_tool for server.py's arithmetic tools in-process, with no transport."""
+    _FUNCS = {
+        "add": lambda a, b: a + b,
+        "subtract": lambda a, b: a - b,
+        "multiply": lambda a, b: a * b,
+        "divide": lambda a, b: a / b,
+    }
+
+    async def call_tool(self, name: str, arguments: dict):
+        from mcp import types
+        result = self._FUNCS[name](arguments["a"], arguments["b"])
+        return types.CallToolResult(content=[types.TextContent(type="text", text=str(result))])
+
+def math_tool_metadata():
+    """MCP tool metadata equivalent to what server.py advertises."""
+    from mcp import types
+    schema = {
+        "type": "object",
+        "properties": {"a": {"type": "number"}, "b": {"type": "number"}},
+        "required": ["a", "b"],
+    }
+    return [
+        types.Tool(name=name, description=f"{name.title()} two numbers.", inputSchema=schema)
+        for name in FakeMCPSession._FUNCS
+    ]
@@ -0,0 +1,96 @@
+"""
+Cost of accumulating messages over a 1,000-step conversation, for both agents.
+
+The fake LLM keeps requesting a tool call until the history holds STEPS messages,
+so every agent/tools step appends to state. "legacy" is the old
+`lambda x, y: x + y` reducer, which copies the history on every step; "append" is
+agent_state.append_messages. A second table times the reducers alone, without
+the per-step LangGraph overhead, at larger history sizes.
+
+    uv run python -m benchmarks.message_accumulation
+"""
+import asyncio
+import contextlib
+import io
+import time
+import tracemalloc
+from typing import Annotated, List, TypedDict
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+import agent
+import agent_without_mcp
+from agent_state import AgentState, append_messages
+from benchmarks.fakes import FakeMCPSession, LoopingToolLLM, math_tool_metadata
+
+STEPS = 1000
+REDUCER_STEPS = (1_000, 10_000, 50_000)
+
+class LegacyAgentState(TypedDict):
+    messages: Annotated[List[BaseMessage], lambda x, y: x + y]
+
+def build_agents(state_cls):
+    # Both agent modules look AgentState up at graph-build time
+    agent.AgentState = agent_without_mcp.AgentState = state_cls
+    agent.UniversalMCPAgent._graph_cache.clear()
+    llm = LoopingToolLLM(steps=STEPS)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {
+            "agent.py": agent.UniversalMCPAgent(
+                FakeMCPSession(), "You are a calculator.", math_tool_metadata(), "MathServer", llm=llm
+            ),
+            "agent_without_mcp.py": agent_without_mcp.LocalMathAgent(llm=llm),
+        }
+
+async def run_conversation(graph_agent):
+    config = {
+        "recursion_limit": STEPS + 10,
+        "configurable": {"mcp_session": getattr(graph_agent, "mcp_session", None)},
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = await graph_agent.graph.ainvoke({"messages": [HumanMessage(content="go")]}, config=config)
+    assert len(result["messages"]) == STEPS
+
+async def measure(graph_agent):
+    start = time.perf_counter()
+    await run_conversation(graph_agent)
+    elapsed = time.perf_counter() - start
+
+    # Separate run for memory: tracemalloc overhead would distort the timing
+    tracemalloc.start()
+    await run_conversation(graph_agent)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+def measure_reducer(reducer, steps: int):
+    message = HumanMessage(content="x")
+    tracemalloc.start()
+    start = time.perf_counter()
+    state = []
+    for _ in range(steps):
+        state = reducer(state, [message])
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024 / 1024
+
+async def main():
+    print(f"{STEPS}-message conversations\n")
+    print(f"{'agent':>20} | {'reducer':>7} | {'time s':>7} | {'peak MiB':>8}")
+    print("-" * 52)
+    for label, state_cls in (("legacy", LegacyAgentState), ("append", AgentState)):
+        for name, graph_agent in build_agents(state_cls).items():
+            elapsed, peak = await measure(graph_agent)
+            print(f"{name:>20} | {label:>7} | {elapsed:>7.2f} | {peak:>8.2f}")
+
+    print(f"\n{'steps':>7} | {'reducer':>7} | {'time ms':>8} | {'peak MiB':>8}")
+    print("-" * 41)
+    reducers = (("legacy", LegacyAgentState.__annotations__["messages"].__metadata__[0]), ("append", append_messages))
+    for steps in REDUCER_STEPS:
+        for label, reducer in reducers:
+            elapsed, peak = measure_reducer(reducer, steps)
+            print(f"{steps:>7} | {label:>7} | {elapsed:>8.2f} | {peak:>8.2f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+Two-stage routing on synthetic registries of 100, 10k and 100k servers.
+
+Each registry holds the six servers of servers.json, placed at random positions among
+generated servers whose names and descriptions draw on overlapping topic words
+("weather", "customer", "message", ...), so the real servers have lexical competition.
+
+For every size, reports:
+  - the time to build the BM25 prefilter and the router (registry load included),
+  - prefilter latency percentiles for one query,
+  - recall: how often the expected server is in the shortlist handed to the LLM,
+  - the router prompt size with every server listed vs the shortlist only,
+  - route() latency with an instant fake LLM, i.e. the router's own overhead.
+
+    uv run python -m benchmarks.router_scale
+"""
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.fakes import FixedReplyLLM
+from client import RegistryRouter
+from routing import BM25Index, RouteCache
+
+SIZES = (100, 10_000, 100_000)
+SHORTLIST = 20
+REPEATS = 50
+QUERIES = [
+    ("Multiply 6 and 7", "MathServer"),
+    ("What is the 7-day forecast for Paris?", "WeatherServer"),
+    ("Exchange rate from USD to EUR", "FinanceServer"),
+    ("Upgrade the subscription tier of customer 42", "CRMAgent"),
+    ("Send a marketing email to new users", "EmailServer"),
+    ("Post a message in the ops Slack channel", "SlackServer"),
+]
+TOPICS = [
+    "weather", "forecast", "stock", "price", "currency", "crypto", "customer", "ticket",
+    "subscription", "email", "notification", "message", "channel", "calendar", "invoice",
+    "payment", "shipping", "inventory", "sensor", "map", "music", "video", "news", "recipe",
+    "flight", "hotel", "tax", "payroll", "document", "search", "log", "metric", "alert",
+    "deployment", "repository", "translation", "image", "database", "report", "survey",
+]
+VERBS = ["Manages", "Searches", "Summarizes", "Tracks", "Converts", "Validates", "Exports", "Syncs", "Monitors"]
+
+def _brand(rng: random.Random) -> str:
+    return "".join(rng.choice("bcdfgklmnprstvz") + rng.choice("aeiou") for _ in range(3))
+
+def synthetic_registry(size: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    with open("servers.json", "r") as f:
+        real = json.load(f)
+    servers = []
+    for i in range(size - len(real)):
+        a, b, c = rng.sample(TOPICS, 3)
+        brand = _brand(rng)
+        servers.append({
+            "name": f"{brand.title()}{a.title()}{i}",
+            "url": f"http://{brand}-{i}.internal/sse",
+            "description": f"{rng.choice(VERBS)} {a} and {b} data, with {c} exports for {_brand(rng)} teams.",
+        })
+    for server in real:
+        servers.insert(rng.randrange(len(servers) + 1), server)
+    return servers
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+async def measure(size: int) -> dict:
+    servers = synthetic_registry(size)
+    start = time.perf_counter()
+    index = BM25Index(servers)
+    build_s = time.perf_counter() - start
+
+    samples, hits = [], 0
+    for query, expected in QUERIES:
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            shortlist = index.ranked(query, limit=SHORTLIST)
+            samples.append(time.perf_counter() - start)
+        hits += expected in {servers[i]["name"] for i, _ in shortlist}
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(servers, f)
+    try:
+        start = time.perf_counter()
+        router = RegistryRouter(
+            f.name, cache=RouteCache(max_size=0), llm=FixedReplyLLM(reply="None", latency=0.0),
+            shortlist_size=SHORTLIST,
+        )
+        router_build_s = time.perf_counter() - start
+        route_samples = []
+        for query, _ in QUERIES * 5:
+            start = time.perf_counter()
+            await router.route(query)
+            route_samples.append(time.perf_counter() - start)
+    finally:
+        os.unlink(f.name)
+
+    shortlist_prompt = RegistryRouter._router_prompt(
+        [servers[i] for i, _ in index.ranked(QUERIES[0][0], limit=SHORTLIST)], 3
+    )
+    return {
+        "build_s": build_s,
+        "router_build_s": router_build_s,
+        "p50_us": _percentile(samples, 50) * 1e6,
+        "p99_us": _percentile(samples, 99) * 1e6,
+        "recall": hits / len(QUERIES),
+        # ~4 characters per token
+        "full_tokens": len(RegistryRouter._router_prompt(servers, 3)) // 4,
+        "shortlist_tokens": len(shortlist_prompt) // 4,
+        "route_ms": statistics.mean(route_samples) * 1000,
+    }
+
+async def main():
+    print(f"Shortlist of {SHORTLIST}, {len(QUERIES)} queries with a known target server\n")
+    print(f"{'servers':>8} | {'index s':>7} | {'router s':>8} | {'p50 us':>7} | {'p99 us':>7} | "
+          f"{'recall':>6} | {'full prompt tok':>15} | {'2-stage tok':>11} | {'route ms':>8}")
+    print("-" * 105)
+    for size in SIZES:
+        r = await measure(size)
+        print(f"{size:>8} | {r['build_s']:>7.2f} | {r['router_build_s']:>8.2f} | {r['p50_us']:>7.0f} | "
+              f"{r['p99_us']:>7.0f} | {r['recall']:>6.0%} | {r['full_tokens']:>15,} | "
+              f"{r['shortlist_tokens']:>11,} | {r['route_ms']:>8.2f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+How often ROUTER_MODE=embedding routes locally, and how often it routes wrongly, on servers.json.
+
+A labelled set of queries is routed with RegistryRouter in embedding mode: arithmetic
+in many phrasings (including the end_to_end corpus), queries for each of the other
+servers, and queries that no server handles. A query routed locally ("embedding" path)
+counts as a hit if it went to the expected server and as a misroute otherwise; the
+rest fall back to the LLM. The same is swept over min_score and min_margin, so the
+defaults can be recalibrated when the registry or its descriptions change.
+
+    uv run python -m benchmarks.router_threshold
+"""
+import asyncio
+import contextlib
+import io
+import json
+
+from benchmarks.end_to_end import CORPUS
+from benchmarks.fakes import FixedReplyLLM
+from client import RegistryRouter
+from routing import EmbeddingIndex, RouteCache
+
+MATH = CORPUS + [
+    "add 2 and 3", "What is 12 times 7?", "Add 10 and 20", "What is 10 divided by 4?",
+    "What is 15 plus 27?", "Calculate 3 * 4 + 5", "What's 9 minus 4?", "sum of 5 and 8",
+    "What is (3 + 4) * 2 / 7?", "compute 144 / 12", "how much is 7 x 8",
+    "What is the product of 6 and 9?", "What is 100 minus 37?", "Evaluate 2 + 2 * 2",
+    "Subtract 8 from 50", "What is half of 90?", "Please add 13 and 29", "Can you multiply 11 by 12?",
+    "What is 81 divided by 9?", "take 7 away from 20", "What's 3 times 3 times 3?",
+    "difference between 50 and 8",
+]
+OTHER = [
+    ("What is the 7-day forecast for Paris?", "WeatherServer"), ("Will it rain in London tomorrow?", "WeatherServer"),
+    ("What's the weather in Tokyo?", "WeatherServer"), ("Exchange rate from USD to EUR", "FinanceServer"),
+    ("What is the current price of AAPL stock?", "FinanceServer"), ("How much is bitcoin worth?", "FinanceServer"),
+    ("Upgrade the subscription tier of customer 42", "CRMAgent"), ("Open a support ticket for customer 7", "CRMAgent"),
+    ("Show the profile of customer Alice", "CRMAgent"), ("Send a marketing email to new users", "EmailServer"),
+    ("Email the invoice notification to Bob", "EmailServer"), ("Post a message in the ops Slack channel", "SlackServer"),
+    ("Create a new Slack channel called launch", "SlackServer"),
+    ("Tell the team on Slack that the build is green", "SlackServer"),
+]
+NONE = [
+    "Tell me a joke", "Translate hello into French", "What is the capital of France?", "Who wrote Hamlet?",
+    "Book a flight to Rome", "Summarize this article", "Play some music", "What time is it in Sydney?",
+    "Write a poem about the sea", "How do I reset my password?",
+]
+LABELLED = [(q, "MathServer") for q in MATH] + OTHER + [(q, None) for q in NONE]
+SWEEP = [(s, m) for s in (0.0, 0.05, 0.1, 0.15, 0.2) for m in (0.0, 0.025, 0.05)]
+
+async def route_all(router: RegistryRouter) -> dict:
+    groups = {"MathServer": [0, 0, 0], "other servers": [0, 0, 0], "no server": [0, 0, 0]}  # [queries, hits, misroutes]
+    for query, expected in LABELLED:
+        decision = await router.route(query)
+        group = groups["MathServer" if expected == "MathServer" else "other servers" if expected else "no server"]
+        group[0] += 1
+        if decision.path == "embedding":
+            right = decision.server is not None and decision.server["name"] == expected
+            group[1 if right else 2] += 1
+    return groups
+
+def sweep(servers: list) -> list:
+    """Local hits and misroutes of the decision rule for each (min_score, min_margin), from the raw scores."""
+    index = EmbeddingIndex(servers)
+    scored = []
+    for query, expected in LABELLED:
+        (best, s1), (_, s2) = index.ranked(query, limit=2)
+        scored.append((servers[best]["name"] == expected, s1, s1 - s2))
+    return [
+        (s, m, sum(ok for ok, s1, gap in scored if s1 >= s and gap >= m),
+         sum(not ok for ok, s1, gap in scored if s1 >= s and gap >= m))
+        for s, m in SWEEP
+    ]
+
+async def main():
+    with open("servers.json", "r") as f:
+        servers = json.load(f)
+    with contextlib.redirect_stdout(io.StringIO()):
+        router = RegistryRouter(
+            "servers.json", mode="embedding", cache=RouteCache(max_size=0),
+            llm=FixedReplyLLM(reply="None", latency=0.0),
+        )
+    groups = await route_all(router)
+
+    print(f"Defaults min_score={router.min_score}, min_margin={router.min_margin}, {len(LABELLED)} labelled queries\n")
+    print(f"{'expected':<14} | {'queries':>7} | {'local hits':>10} | {'misroutes':>9} | {'hit rate':>8}")
+    print("-" * 62)
+    for name, (n, hits, wrong) in groups.items():
+        print(f"{name:<14} | {n:>7} | {hits:>10} | {wrong:>9} | {hits / n:>8.0%}")
+
+    print(f"\n{'min_score':>9} | {'min_margin':>10} | {'local hits':>10} | {'misroutes':>9}")
+    print("-" * 49)
+    for s, m, hits, wrong in sweep(servers):
+        print(f"{s:>9.3f} | {m:>10.3f} | {hits:>10} | {wrong:>9}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+"""
+REST throughput of `server.py --workers N`, and SSE sessions working across workers.
+
+For each worker count (1, 2, 4, ... up to the number of cores) a server is started on
+PORT. Load comes from CLIENT_PROCESSES processes, each keeping CONNECTIONS keep-alive
+connections busy with GET /add for DURATION seconds over raw asyncio streams, so the
+client costs far less CPU per request than the server. SESSIONS MCP sessions over
+SSE then make CALLS tool calls each: a session whose message POSTs reach another
+worker than its event stream only works if they are forwarded to the right worker,
+so every call must succeed.
+
+Clients share the machine with the server, so expect scaling to flatten before the
+core count; on a single core, the extra workers only show their overhead.
+
+    uv run python -m benchmarks.server_workers
+"""
+import asyncio
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+
+from client import MCPConnectionPool
+
+PORT = 8500
+CORES = os.cpu_count() or 1
+WORKER_COUNTS = sorted({1, 2} | {n for n in (4, 8, 16, 32) if n <= CORES} | {CORES})
+CLIENT_PROCESSES = max(1, CORES // 2)
+CONNECTIONS = 32
+DURATION = 5.0
+SESSIONS = 16
+CALLS = 20
+REQUEST = f"GET /add?a=1&b=2 HTTP/1.1\r\nHost: 127.0.0.1:{PORT}\r\n\r\n".encode()
+
+@contextlib.contextmanager
+def server(workers: int):
+    proc = subprocess.Popen(
+        [sys.executable, "server.py", "--workers", str(workers), "--port", str(PORT), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{PORT}/add?a=1&b=1", timeout=1):
+                    break
+            except OSError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"server.py --workers {workers} did not start on port {PORT}")
+                time.sleep(0.2)
+        time.sleep(1)  # let every worker finish starting, not just the first
+        yield
+    finally:
+        proc.terminate()
+        proc.wait()
+
+async def _connection(deadline: float) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", PORT)
+    done = 0
+    try:
+        while time.monotonic() < deadline:
+            writer.write(REQUEST)
+            headers = await reader.readuntil(b"\r\n\r\n")
+            length = int(headers.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+            await reader.readexactly(length)
+            done += 1
+    finally:
+        writer.close()
+    return done
+
+def hammer(duration: float) -> int:
+    """One client process: CONNECTIONS keep-alive connections, each one request at a time."""
+    async def run() -> int:
+        deadline = time.monotonic() + duration
+        return sum(await asyncio.gather(*(_connection(deadline) for _ in range(CONNECTIONS))))
+    return asyncio.run(run())
+
+async def sse_sessions() -> tuple:
+    errors = 0
+
+    async def session(pool: MCPConnectionPool, i: int):
+        nonlocal errors
+        async with pool.connection(f"http://127.0.0.1:{PORT}/sse") as conn:
+            for _ in range(CALLS):
+                result = await conn.session.call_tool("add", {"a": i, "b": 1})
+                errors += result.isError or float(result.content[0].text) != i + 1
+
+    start = time.perf_counter()
+    # The client logs every connection; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with MCPConnectionPool(max_per_url=SESSIONS) as pool:
+            await asyncio.gather(*(session(pool, i) for i in range(SESSIONS)))
+    return SESSIONS * CALLS / (time.perf_counter() - start), errors
+
+def main():
+    rows = []
+    with ProcessPoolExecutor(CLIENT_PROCESSES) as clients:
+        for workers in WORKER_COUNTS:
+            with server(workers):
+                list(clients.map(hammer, [0.5] * CLIENT_PROCESSES))  # warm-up
+                requests = sum(clients.map(hammer, [DURATION] * CLIENT_PROCESSES))
+                sse_rate, sse_errors = asyncio.run(sse_sessions())
+            rows.append((workers, requests / DURATION, sse_rate, sse_errors))
+
+    print(f"{CORES} cores, {CLIENT_PROCESSES} client processes x {CONNECTIONS} connections, {DURATION:.0f} s per run\n")
+    print(f"{'workers':>7} | {'REST req/s':>10} | {'speedup':>7} | {'SSE calls/s':>11} | {'SSE errors':>10}")
+    print("-" * 58)
+    for workers, rate, sse_rate, sse_errors in rows:
+        print(f"{workers:>7} | {rate:>10,.0f} | {rate / rows[0][1]:>6.2f}x | {sse_rate:>11,.0f} | {sse_errors:>10}")
+
+if __name__ == "__main__":
+    main()
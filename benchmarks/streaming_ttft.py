@@ -0,0 +1,48 @@
+"""
+Time until the user sees the first words of the answer, with and without token streaming.
+
+Runs UniversalMCPAgent against an in-process MCP session and a fake LLM that takes
+LATENCY before its first token and TOKEN_LATENCY per word after that. Without
+streaming nothing is shown until the whole answer exists; with streaming the first
+word is shown as soon as the model produces it.
+
+    uv run python -m benchmarks.streaming_ttft
+"""
+import asyncio
+import contextlib
+import io
+import time
+
+from agent import UniversalMCPAgent
+from benchmarks.fakes import FakeMCPSession, ScriptedMathLLM, math_tool_metadata
+
+LATENCY = 0.05            # seconds until the model's first token
+TOKEN_LATENCY = (0.01, 0.03)
+QUERIES = 20
+
+async def first_output(agent: UniversalMCPAgent, query: str, stream_tokens: bool) -> float:
+    start = time.perf_counter()
+    async with contextlib.aclosing(agent.events(query, stream_tokens=stream_tokens)) as events:
+        async for event in events:
+            if event["type"] in ("token", "answer"):
+                return time.perf_counter() - start
+    raise RuntimeError("agent produced no answer")
+
+async def measure(token_latency: float, stream_tokens: bool) -> float:
+    llm = ScriptedMathLLM(latency=LATENCY, token_latency=token_latency)
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = UniversalMCPAgent(FakeMCPSession(), "", math_tool_metadata(), "bench", llm=llm)
+        times = [await first_output(agent, f"add {i} and {i + 1}", stream_tokens) for i in range(QUERIES)]
+    return sum(times) / len(times) * 1000
+
+async def main():
+    print(f"{QUERIES} queries, 2 LLM calls each, {LATENCY * 1000:.0f} ms to first token per call\n")
+    print(f"{'ms per token':>12} | {'buffered first output ms':>24} | {'streamed TTFT ms':>16}")
+    print("-" * 60)
+    for token_latency in TOKEN_LATENCY:
+        buffered = await measure(token_latency, False)
+        streamed = await measure(token_latency, True)
+        print(f"{token_latency * 1000:>12.0f} | {buffered:>24.1f} | {streamed:>16.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""
+Per-query tool construction cost with and without the arg-schema cache.
+
+Builds MCPDynamicTool instances for synthetic MCP tool listings of 4, 100 and 1,000
+tools, the way UniversalMCPAgent does on every query.
+
+    uv run python -m benchmarks.tool_schemas
+"""
+import statistics
+import time
+
+from mcp import types
+
+import agent
+from agent import MCPDynamicTool
+
+TOOL_COUNTS = (4, 100, 1000)
+QUERIES = 20
+
+def synthetic_tools(count: int):
+    """MCP tool metadata shaped like server.py's tools, with 2-5 parameters each."""
+    tools = []
+    for i in range(count):
+        n_params = 2 + i % 4
+        properties = {
+            f"arg{p}": {"type": ("number", "string", "integer", "boolean")[p % 4], "description": f"Argument {p}"}
+            for p in range(n_params)
+        }
+        tools.append(types.Tool(
+            name=f"tool_{i}",
+            description=f"Synthetic tool number {i}.",
+            inputSchema={"type": "object", "properties": properties, "required": list(properties)[:2]},
+        ))
+    return tools
+
+def build_all(tools):
+    return [MCPDynamicTool.from_mcp_metadata(t, session=None) for t in tools]
+
+def time_queries(tools, cached: bool):
+    samples = []
+    for _ in range(QUERIES):
+        if not cached:
+            agent._ARGS_SCHEMA_CACHE.clear()
+        start = time.perf_counter()
+        build_all(tools)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main():
+    print(f"{'tools':>6} | {'uncached ms/query':>18} | {'cached ms/query':>16} | {'speedup':>8}")
+    print("-" * 58)
+    for count in TOOL_COUNTS:
+        tools = synthetic_tools(count)
+        uncached = time_queries(tools, cached=False)
+        build_all(tools)  # warm the cache once, as the first query of a process would
+        cached = time_queries(tools, cached=True)
+        print(f"{count:>6} | {uncached:>18.2f} | {cached:>16.2f} | {uncached / cached:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,485 @@
 import asyncio
+import hashlib
 import json
-from typing import Optional, List
-from contextlib import AsyncExitStack
-from mcp import ClientSession
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict, NamedTuple, Tuple, Callable, Awaitable
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+from mcp import ClientSession, types
 from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamable_http_client
+import httpx
 from langchain_openai import ChatOpenAI
+from langchain_core.language_models import BaseChatModel
+from routing import BM25Index, EmbeddingIndex, RouteCache, fingerprint
+from tracing import span
+
+class RouteDecision(NamedTuple):
+    """Outcome of routing a query: the chosen server and how it was chosen."""
+    server: Optional[dict]
+    path: str              # "llm", "embedding", "llm_fallback" or "cache"
+    score: Optional[float] = None
+    # Every server worth trying, best first, with its embedding score when one was computed;
+    # candidates[0] is `server`. The execution layer fails over down this list.
+    candidates: Tuple[Tuple[dict, Optional[float]], ...] = ()
+
+class ServerHealth:
+    """Live health of one server URL."""
+    def __init__(self):
+        self.healthy = True
+        self.latency_ewma: Optional[float] = None
+        self.consecutive_failures = 0
+        self.last_checked: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+class HealthChecker:
+    """
+    Probes every registry URL in the background and keeps a status table with a
+    latency EWMA. A server is unhealthy after `unhealthy_after` consecutive failures,
+    from probes or from real connection attempts, and healthy again after one success.
+    At most max_concurrent_probes probes run at once, so large registries are checked
+    in waves rather than all queued behind the client's connection limit.
+    """
+    def __init__(
+        self,
+        interval: float = 15.0,
+        timeout: float = 2.0,
+        alpha: float = 0.3,
+        unhealthy_after: int = 1,
+        max_concurrent_probes: int = 64,
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.alpha = alpha
+        self.unhealthy_after = unhealthy_after
+        self.max_concurrent_probes = max_concurrent_probes
+        self.status: Dict[str, ServerHealth] = {}
+
+    def down(self) -> List[str]:
+        return [url for url, health in self.status.items() if not health.healthy]
+
+    def record_success(self, url: str, latency: Optional[float] = None):
+        health = self.status.setdefault(url, ServerHealth())
+        if latency is not None:
+            health.latency_ewma = latency if health.latency_ewma is None else \
+                self.alpha * latency + (1 - self.alpha) * health.latency_ewma
+        health.consecutive_failures = 0
+        health.last_checked = time.time()
+        health.last_error = None
+        if not health.healthy:
+            print(f"[*] Health: {url} is back up")
+        health.healthy = True
+
+    def record_failure(self, url: str, error: str):
+        health = self.status.setdefault(url, ServerHealth())
+        health.consecutive_failures += 1
+        health.last_checked = time.time()
+        health.last_error = error
+        if health.healthy and health.consecutive_failures >= self.unhealthy_after:
+            print(f"[!] Health: {url} is down, routing around it ({error})")
+            health.healthy = False
+
+    async def probe(self, client: httpx.AsyncClient, url: str):
+        """One GET of the SSE endpoint: any non-5xx response within the timeout counts as up."""
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with client.stream("GET", url, headers={"Accept": "text/event-stream"}) as response:
+                    if response.status_code >= 500:
+                        raise httpx.HTTPStatusError(
+                            f"HTTP {response.status_code}", request=response.request, response=response
+                        )
+        except Exception as e:
+            self.record_failure(url, f"{type(e).__name__}: {e}" if str(e) else type(e).__name__)
+            return
+        self.record_success(url, time.perf_counter() - start)
+
+    async def check_all(self, urls: List[str], client: httpx.AsyncClient):
+        # A probe's timeout starts once it holds a slot, not while it waits for one
+        limit = asyncio.Semaphore(self.max_concurrent_probes)
+
+        async def probe(url: str):
+            async with limit:
+                await self.probe(client, url)
+
+        await asyncio.gather(*(probe(url) for url in dict.fromkeys(urls)))
+
+    @asynccontextmanager
+    async def monitor(self, urls: Callable[[], List[str]]):
+        """
+        Probes urls() once before the block, so the first query already avoids dead
+        servers, then every `interval` seconds in the background until the block exits.
+        """
+        # As many connections as concurrent probes, so a probe never waits for one
+        limits = httpx.Limits(max_connections=self.max_concurrent_probes)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            await self.check_all(urls(), client)
+
+            async def loop():
+                while True:
+                    await asyncio.sleep(self.interval)
+                    await self.check_all(urls(), client)
+
+            task = asyncio.create_task(loop())
+            try:
+                yield self
+            finally:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+
+    def table(self) -> List[dict]:
+        return [
+            {
+                "url": url,
+                "healthy": h.healthy,
+                "latency_ewma_ms": round(h.latency_ewma * 1000, 1) if h.latency_ewma is not None else None,
+                "consecutive_failures": h.consecutive_failures,
+                "last_error": h.last_error,
+            }
+            for url, h in self.status.items()
+        ]
 
 class RegistryRouter:
-    """Manages server discovery and routing logic."""
-    def __init__(self, registry_path: str):
-        with open(registry_path, "r") as f:
-            self.servers = json.load(f)
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    """
+    Manages server discovery and routing logic.
 
-    async def route_query(self, query: str) -> Optional[dict]:
-        """Decides which server is relevant for the user query."""
+    Registries larger than shortlist_size are routed in two stages: a BM25 prefilter
+    over server names and descriptions picks the shortlist_size best matches, and the
+    LLM chooses among those only, so the prompt stays the same size however large the
+    registry grows.
+
+    In "embedding" mode a query is routed locally when its best match scores at least
+    min_score and beats the runner-up by min_margin; otherwise the LLM decides. The
+    defaults are calibrated on servers.json by benchmarks/router_threshold.py.
+    """
+    MODES = ("llm", "embedding")
+
+    def __init__(
+        self,
+        registry_path: str,
+        mode: str = "llm",
+        min_score: float = 0.1,
+        min_margin: float = 0.025,
+        cache: Optional[RouteCache] = None,
+        llm: Optional[BaseChatModel] = None,
+        health: Optional[HealthChecker] = None,
+        max_candidates: int = 3,
+        shortlist_size: int = 20,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown router mode '{mode}', expected one of {self.MODES}")
+        self.registry_path = registry_path
+        self.llm = llm or ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        self.mode = mode
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.cache = cache if cache is not None else RouteCache()
+        self.health = health
+        self.max_candidates = max_candidates
+        self.shortlist_size = shortlist_size
+        # Names of recently chosen servers, most recent last; a cheap hint for likely()
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self.registry_digest: Optional[str] = None
+        self._load_registry()
+
+    def _load_registry(self):
+        """(Re)reads the registry and rebuilds everything derived from it if it changed."""
+        with open(self.registry_path, "rb") as f:
+            raw = f.read()
+        self._registry_mtime = os.stat(self.registry_path).st_mtime_ns
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest == self.registry_digest:
+            return
+
+        self.servers = json.loads(raw)
+        self._by_name = {s["name"]: s for s in self.servers}
+        self._by_url: Dict[str, List[int]] = {}
+        for i, s in enumerate(self.servers):
+            self._by_url.setdefault(s["url"], []).append(i)
+        self.registry_digest = digest
+        # Only registries small enough to be listed in full get a precomputed prompt
+        self._system_prompt = self._router_prompt(self.servers, self.max_candidates) \
+            if len(self.servers) <= self.shortlist_size else None
+        # Sparse inverted index for the LLM shortlist and likely(); cheap at any registry size
+        self.prefilter = BM25Index(self.servers)
+        # Server descriptions are vectorized once; each query is a single mat-vec product.
+        self.index = EmbeddingIndex(self.servers) if self.mode == "embedding" else None
+        self.cache.clear()
+
+    @staticmethod
+    def _router_prompt(servers: List[dict], max_candidates: int) -> str:
         server_descriptions = "\n".join([
-            f"- {s['name']}: {s['description']}" for s in self.servers
+            f"- {s['name']}: {s['description']}" for s in servers
         ])
-        
-        system_prompt = (
+        return (
             "You are an MCP Router. Below is a list of available servers and their capabilities:\n"
             f"{server_descriptions}\n\n"
-            "Given the user's query, return ONLY the name of the most relevant server. "
-            "If none match, return 'None'."
+            f"Given the user's query, return ONLY the names of up to {max_candidates} servers that "
+            "can handle it, most relevant first, separated by commas. If none match, return 'None'."
         )
-        
+
+    def urls(self) -> List[str]:
+        return [s["url"] for s in self.servers]
+
+    def _down(self) -> List[int]:
+        """Registry indexes of servers the health checker currently reports as down."""
+        if self.health is None:
+            return []
+        return sorted(i for url in self.health.down() for i in self._by_url.get(url, ()))
+
+    def _refresh_registry(self):
+        try:
+            changed = os.stat(self.registry_path).st_mtime_ns != self._registry_mtime
+        except OSError:
+            return  # keep serving the last good registry
+        if changed:
+            self._load_registry()
+
+    def likely(self, query: str, limit: int = 2) -> List[dict]:
+        """
+        A cheap guess at where a query will be routed, made before routing (an LLM call
+        in "llm" mode) finishes: lexical matches first, then recently chosen servers.
+        """
+        self._refresh_registry()
+        down = self._down()
+        guesses = {
+            self.servers[i]["name"]: self.servers[i]
+            for i, _ in self.prefilter.ranked(query, exclude=down, limit=limit)
+        }
+        down_names = {self.servers[i]["name"] for i in down}
+        for name in reversed(self._recent):
+            if len(guesses) >= limit:
+                break
+            if name in self._by_name and name not in down_names:
+                guesses.setdefault(name, self._by_name[name])
+        return list(guesses.values())
+
+    async def route_query(self, query: str) -> Optional[dict]:
+        """Decides which server is most relevant for the user query."""
+        return (await self.route(query)).server
+
+    async def route(self, query: str) -> RouteDecision:
+        """Routes a query, serving repeats of the same query shape from the cache."""
+        with span("route") as s:
+            decision = await self._route(query)
+            s.set("path", decision.path)
+        if decision.server is not None:
+            self._recent[decision.server["name"]] = None
+            self._recent.move_to_end(decision.server["name"])
+            if len(self._recent) > 16:
+                self._recent.popitem(last=False)
+        return decision
+
+    async def _route(self, query: str) -> RouteDecision:
+        self._refresh_registry()
+        down = self._down()
+        key = fingerprint(query)
+        if down:
+            # Decisions made around dead servers must not outlive their outage
+            key += "|down:" + ",".join(self.servers[i]["name"] for i in down)
+        cached = self.cache.get(key)
+        if cached is not RouteCache.MISS:
+            return cached._replace(path="cache")
+
+        digest = self.registry_digest
+        decision = await self._route_uncached(query, down)
+        # Skip the put if the registry was reloaded while the LLM was deciding
+        if digest == self.registry_digest:
+            self.cache.put(key, decision, negative=decision.server is None)
+        return decision
+
+    async def _route_uncached(self, query: str, down: List[int]) -> RouteDecision:
+        """Routes locally when the embedding match is confident, otherwise asks the LLM."""
+        if self.mode == "llm":
+            ranked = await self._rank_with_llm(query, down)
+            return self._decision("llm", [(s, None) for s in ranked])
+
+        ranked = self.index.ranked(query, exclude=down, limit=max(self.max_candidates, 2))
+        best_score = ranked[0][1] if ranked else 0.0
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        # Short queries score low against every description, so the gap to the runner-up
+        # says more about a match than its score alone
+        if best_score >= self.min_score and best_score - runner_up >= self.min_margin:
+            candidates = [(self.servers[i], score) for i, score in ranked[:self.max_candidates] if score >= self.min_score]
+            return self._decision("embedding", candidates)
+        scores = {self.servers[i]["name"]: score for i, score in ranked}
+        ranked = await self._rank_with_llm(query, down)
+        return self._decision("llm_fallback", [(s, scores.get(s["name"])) for s in ranked], best_score)
+
+    @staticmethod
+    def _decision(path: str, candidates: List[Tuple[dict, Optional[float]]], score: Optional[float] = None) -> RouteDecision:
+        if not candidates:
+            return RouteDecision(None, path, score)
+        server, top_score = candidates[0]
+        return RouteDecision(server, path, top_score if score is None else score, tuple(candidates))
+
+    async def _rank_with_llm(self, query: str, down: List[int] = ()) -> List[dict]:
+        # Servers that are down are left out of the prompt, so the LLM cannot pick them
+        if self._system_prompt is not None:
+            down = set(down)
+            servers = [s for i, s in enumerate(self.servers) if i not in down]
+            system_prompt = self._router_prompt(servers, self.max_candidates) if down else self._system_prompt
+        else:
+            with span("prefilter") as s:
+                shortlist = self.prefilter.ranked(query, exclude=down, limit=self.shortlist_size)
+                s.set("shortlisted", len(shortlist))
+            # Nothing in the registry shares a word with the query: no server to offer the LLM
+            if not shortlist:
+                return []
+            servers = [self.servers[i] for i, _ in shortlist]
+            system_prompt = self._router_prompt(servers, self.max_candidates)
         response = await self.llm.ainvoke([
             ("system", system_prompt),
             ("user", query)
         ])
         
-        target_name = response.content.strip()
-        return next((s for s in self.servers if s["name"] == target_name), None)
+        by_name = {s["name"]: s for s in servers}
+        names = [n.strip() for n in response.content.replace("\n", ",").split(",")]
+        # Unknown names (including "None") are dropped; order and first occurrence are kept
+        return [by_name[n] for n in dict.fromkeys(names) if n in by_name][:self.max_candidates]
+
+DEFAULT_INSTRUCTION = "You are a helpful assistant using the provided tools."
+
+class ToolMetadataCache:
+    """
+    Per-server cache of tool lists and assistant instructions, optionally persisted to disk.
+    Entries loaded from disk may predate a server restart that changed its tools, and
+    servers announce no change on restart: each is served once more while it is
+    refreshed in the background, then kept fresh as usual.
+    """
+    def __init__(self, ttl: float = 3600.0, persist_path: Optional[str] = None):
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self._entries: Dict[str, dict] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        if persist_path and os.path.exists(persist_path):
+            self._load()
+
+    def get(self, url: str) -> Optional[Tuple[List[types.Tool], str]]:
+        entry = self._entries.get(url)
+        # Wall-clock time so entries persisted by an earlier process age correctly
+        if entry is None or time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        return entry["tools"], entry["instruction"]
+
+    def put(self, url: str, tools: List[types.Tool], instruction: str):
+        self._entries[url] = {"fetched_at": time.time(), "tools": tools, "instruction": instruction}
+        self._save()
+
+    def invalidate(self, url: str):
+        if self._entries.pop(url, None) is not None:
+            print(f"[*] Tool metadata for {url} changed on the server, cache invalidated")
+            self._save()
+
+    async def get_or_fetch(
+        self, url: str, fetch: Callable[[], Awaitable[Tuple[List[types.Tool], str]]]
+    ) -> Tuple[List[types.Tool], str]:
+        """Serves from the cache, sharing a single in-flight fetch between concurrent misses."""
+        cached = self.get(url)
+        if cached is not None:
+            if self._entries[url].pop("from_disk", False) and url not in self._inflight:
+                self._inflight[url] = asyncio.create_task(self._revalidate(url, fetch, cached))
+            return cached
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_store(url, fetch))
+            self._inflight[url] = task
+        # Shielded so one cancelled caller does not abort the fetch for the others
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, url, fetch):
+        try:
+            tools, instruction = await fetch()
+            self.put(url, tools, instruction)
+            return tools, instruction
+        finally:
+            self._inflight.pop(url, None)
+
+    async def _revalidate(self, url, fetch, stale):
+        try:
+            return await self._fetch_and_store(url, fetch)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            print(f"[!] Could not refresh tool metadata for {url}: {error}")
+            # Try again on the next connection
+            if url in self._entries:
+                self._entries[url]["from_disk"] = True
+            return stale
+
+    def _load(self):
+        try:
+            with open(self.persist_path, "r") as f:
+                data = json.load(f)
+            for url, entry in data.items():
+                self._entries[url] = {
+                    "fetched_at": entry["fetched_at"],
+                    "tools": [types.Tool.model_validate(t) for t in entry["tools"]],
+                    "instruction": entry["instruction"],
+                    "from_disk": True,
+                }
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[!] Ignoring unreadable tool metadata cache {self.persist_path}: {e}")
+
+    def _save(self):
+        if not self.persist_path:
+            return
+        data = {
+            url: {
+                "fetched_at": entry["fetched_at"],
+                "tools": [t.model_dump(mode="json", exclude_none=True) for t in entry["tools"]],
+                "instruction": entry["instruction"],
+            }
+            for url, entry in self._entries.items()
+        }
+        tmp_path = f"{self.persist_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.persist_path)
+
+TRANSPORTS = ("sse", "streamable_http")
 
 class MCPConnection:
-    """Manages the lifecycle of the MCP connection."""
-    def __init__(self, url: str):
+    """
+    Manages the lifecycle of the MCP connection.
+
+    transport is "sse" (a long-lived event stream, bound to the server process that
+    opened it) or "streamable_http" (one HTTP request per message, which any replica
+    of a stateless server can answer). Registry entries choose it with a "transport" key.
+    """
+    def __init__(self, url: str, metadata_cache: Optional[ToolMetadataCache] = None, transport: str = "sse"):
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown MCP transport '{transport}', expected one of {TRANSPORTS}")
         self.url = url
+        self.metadata_cache = metadata_cache
+        self.transport = transport
         self.session: Optional[ClientSession] = None
         self._exit_stack = AsyncExitStack()
 
     async def __aenter__(self):
         print(f"[*] Attempting to connect to: {self.url}")
         try:
-            sse_ctx = sse_client(self.url)
-            streams = await self._exit_stack.enter_async_context(sse_ctx)
-            read_stream, write_stream = streams
+            if self.transport == "sse":
+                with span("sse_connect", url=self.url):
+                    read_stream, write_stream = await self._exit_stack.enter_async_context(sse_client(self.url))
+            else:
+                # Opens no connection yet: the first request is initialize
+                read_stream, write_stream, _ = await self._exit_stack.enter_async_context(
+                    streamable_http_client(self.url)
+                )
             
-            session_ctx = ClientSession(read_stream, write_stream)
+            session_ctx = ClientSession(read_stream, write_stream, message_handler=self._handle_message)
             self.session = await self._exit_stack.enter_async_context(session_ctx)
             
-            await self.session.initialize()
+            with span("initialize"):
+                await self.session.initialize()
             return self
-        except Exception as e:
-            print(f"[!] Connection failed: {e}")
+        except BaseException as e:
+            # Cancellation too (a released speculative checkout, a failover timeout): the
+            # stream must be closed now, by the task that opened it
+            if isinstance(e, Exception):
+                print(f"[!] Connection failed: {e}")
             await self._exit_stack.aclose()
             raise
 
@@ -62,13 +487,265 @@ class MCPConnection:
         print(f"[*] Closing connection to: {self.url}")
         await self._exit_stack.aclose()
 
+    async def _handle_message(self, message):
+        """Drops cached metadata when the server announces that its tools or prompts changed."""
+        if self.metadata_cache is None or not isinstance(message, types.ServerNotification):
+            return
+        if isinstance(message.root, (types.ToolListChangedNotification, types.PromptListChangedNotification)):
+            self.metadata_cache.invalidate(self.url)
+
     async def get_tools_and_instructions(self):
         if not self.session:
             raise RuntimeError("MCP Session not connected")
-        mcp_tools = await self.session.list_tools()
-        try:
-            mcp_prompt = await self.session.get_prompt("math_assistant_instructions")
-            instruction = mcp_prompt.messages[0].content.text
-        except:
-            instruction = "You are a helpful assistant using the provided tools."
+        with span("tool_metadata"):
+            if self.metadata_cache is None:
+                return await self._fetch_tools_and_instructions()
+            return await self.metadata_cache.get_or_fetch(self.url, self._fetch_tools_and_instructions)
+
+    async def _fetch_tools_and_instructions(self):
+        mcp_tools, instruction = await asyncio.gather(
+            self._list_tools(),
+            self._fetch_instruction(),
+        )
         return mcp_tools.tools, instruction
+
+    async def _list_tools(self) -> types.ListToolsResult:
+        with span("list_tools"):
+            return await self.session.list_tools()
+
+    async def _fetch_instruction(self) -> str:
+        with span("get_prompt") as s:
+            try:
+                mcp_prompt = await self.session.get_prompt("math_assistant_instructions")
+                return mcp_prompt.messages[0].content.text
+            except Exception:
+                s.set("fallback", True)
+                return DEFAULT_INSTRUCTION
+
+class _PooledConnection:
+    """Owns one MCPConnection inside a dedicated task so any task can release it."""
+    def __init__(self, url: str, metadata_cache: Optional[ToolMetadataCache] = None, transport: str = "sse"):
+        self.url = url
+        self.metadata_cache = metadata_cache
+        self.transport = transport
+        self.connection: Optional[MCPConnection] = None
+        self.last_used = time.monotonic()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def open(self):
+        # The SSE client is built on anyio task groups, which must be exited by the
+        # task that entered them. Holding the connection open in its own task lets
+        # the query task check it in and the reaper task close it later.
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready))
+        try:
+            self.connection = await ready
+        except BaseException:
+            await self.close()
+            raise
+
+    async def _run(self, ready: asyncio.Future):
+        try:
+            async with MCPConnection(self.url, self.metadata_cache, self.transport) as conn:
+                ready.set_result(conn)
+                await self._closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                print(f"[!] Pooled connection to {self.url} ended with error: {e}")
+        finally:
+            if not ready.done():
+                ready.cancel()
+
+    async def close(self, timeout: float = 5.0):
+        self._closing.set()
+        if self._task is None:
+            return
+        if self.connection is None:
+            # Still connecting (e.g. open() was cancelled): nothing to shut down cleanly
+            self._task.cancel()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            print(f"[!] Timed out closing pooled connection to: {self.url}")
+
+class MCPConnectionPool:
+    """Keeps initialized MCP sessions alive across queries, keyed by server URL."""
+    def __init__(
+        self,
+        max_per_url: int = 4,
+        idle_timeout: float = 300.0,
+        validate_after: float = 30.0,
+        ping_timeout: float = 5.0,
+        reap_interval: float = 30.0,
+        metadata_cache: Optional[ToolMetadataCache] = None,
+        health: Optional[HealthChecker] = None,
+    ):
+        self.max_per_url = max_per_url
+        self.idle_timeout = idle_timeout
+        self.validate_after = validate_after
+        self.ping_timeout = ping_timeout
+        self.reap_interval = reap_interval
+        self.metadata_cache = metadata_cache
+        # Connection attempts double as health checks between background probes
+        self.health = health
+        self._idle: Dict[str, List[_PooledConnection]] = {}
+        self._leased: Dict[MCPConnection, _PooledConnection] = {}
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _limit(self, url: str) -> asyncio.Semaphore:
+        if url not in self._limits:
+            self._limits[url] = asyncio.Semaphore(self.max_per_url)
+        return self._limits[url]
+
+    async def checkout(self, url: str, transport: str = "sse") -> MCPConnection:
+        """Hands out an initialized connection, reusing an idle one when possible."""
+        with span("checkout", url=url) as s:
+            connection, reused = await self._checkout(url, transport)
+            s.set("reused", reused)
+            return connection
+
+    async def _checkout(self, url: str, transport: str) -> Tuple[MCPConnection, bool]:
+        if self._closed:
+            raise RuntimeError("MCP connection pool is closed")
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+        limit = self._limit(url)
+        await limit.acquire()
+        try:
+            idle = self._idle.setdefault(url, [])
+            while idle:
+                # LIFO: the most recently used connection is the most likely to be healthy
+                pooled = idle.pop()
+                if await self._is_usable(pooled):
+                    print(f"[*] Reusing pooled connection to: {url}")
+                    reused = True
+                    break
+                await pooled.close()
+            else:
+                pooled = _PooledConnection(url, self.metadata_cache, transport)
+                try:
+                    await pooled.open()
+                except Exception as e:
+                    if self.health is not None:
+                        self.health.record_failure(url, type(e).__name__)
+                    raise
+                if self.health is not None:
+                    self.health.record_success(url)
+                reused = False
+        except BaseException:
+            limit.release()
+            raise
+
+        self._leased[pooled.connection] = pooled
+        return pooled.connection, reused
+
+    async def checkin(self, connection: MCPConnection, discard: bool = False):
+        """Returns a connection to the pool, or closes it if it may be broken."""
+        pooled = self._leased.pop(connection)
+        self._limit(pooled.url).release()
+        if discard or self._closed or not pooled.alive:
+            await pooled.close()
+            return
+        pooled.last_used = time.monotonic()
+        self._idle.setdefault(pooled.url, []).append(pooled)
+
+    @asynccontextmanager
+    async def connection(self, url: str, transport: str = "sse"):
+        """Checks out a connection for the duration of the block."""
+        conn = await self.checkout(url, transport)
+        try:
+            yield conn
+        except BaseException:
+            # A failed query may have left the session mid-request; start fresh next time.
+            await self.checkin(conn, discard=True)
+            raise
+        await self.checkin(conn)
+
+    async def _is_usable(self, pooled: _PooledConnection) -> bool:
+        if not pooled.alive:
+            return False
+        if time.monotonic() - pooled.last_used < self.validate_after:
+            return True
+        try:
+            await asyncio.wait_for(pooled.connection.session.send_ping(), self.ping_timeout)
+            return True
+        except Exception as e:
+            print(f"[!] Pooled connection to {pooled.url} is stale, reconnecting. ({e!r})")
+            return False
+
+    async def _reap_idle(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            now = time.monotonic()
+            for url, idle in list(self._idle.items()):
+                expired = [
+                    p for p in idle
+                    if not p.alive or now - p.last_used > self.idle_timeout
+                ]
+                for pooled in expired:
+                    idle.remove(pooled)
+                await asyncio.gather(*(p.close() for p in expired))
+
+    async def close(self):
+        """Closes every idle connection; leased ones are closed when checked in."""
+        self._closed = True
+        if self._reaper is not None:
+            self._reaper.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._reaper
+            self._reaper = None
+        idle = [p for conns in self._idle.values() for p in conns]
+        self._idle.clear()
+        await asyncio.gather(*(p.close() for p in idle))
+
+class SpeculativeCheckouts:
+    """
+    Connections checked out before the route is decided. The route's server is claimed
+    from here if it was guessed; release() cancels the wrong guesses still connecting
+    and returns any that finished to the pool unused, where they stay warm.
+    """
+    def __init__(self, pool: MCPConnectionPool, servers: List[dict]):
+        self.pool = pool
+        self._tasks: Dict[str, asyncio.Task] = {
+            s["url"]: asyncio.create_task(pool.checkout(s["url"], s.get("transport", "sse")))
+            for s in {s["url"]: s for s in servers}.values()
+        }
+
+    async def checkout(self, server: dict) -> MCPConnection:
+        """The speculative connection to a registry server if there is one, otherwise a normal checkout."""
+        url = server["url"]
+        task = self._tasks.pop(url, None)
+        if task is None:
+            return await self.pool.checkout(url, server.get("transport", "sse"))
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Cancelled by our caller (e.g. a failover timeout), not by release()
+            task.cancel()
+            self._tasks[url] = task
+            raise
+
+    async def release(self, keep: List[str] = ()):
+        """Gives back every speculative connection except those to urls in keep."""
+        tasks = [self._tasks.pop(url) for url in list(self._tasks) if url not in keep]
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, MCPConnection):
+                await self.pool.checkin(result)
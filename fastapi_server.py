@@ -0,0 +1,173 @@
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Literal, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+import uvicorn
+
+from agent import default_llm, describe_error, run_query, stream_query
+from client import HealthChecker, MCPConnectionPool, RegistryRouter, ToolMetadataCache
+from tracing import tracer
+
+# --- ADMISSION CONTROL ---
+
+class Overloaded(Exception):
+    """No capacity to take the request within the queueing budget."""
+
+class AdmissionController:
+    """
+    Caps concurrently running queries and how many may wait for a slot.
+    Beyond that, requests are rejected at once with 503 instead of piling up
+    behind a backlog that would time out anyway.
+    """
+    def __init__(self, max_active: int, max_waiting: int, wait_timeout: float):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._slots = asyncio.Semaphore(max_active)
+
+    @property
+    def saturated(self) -> bool:
+        return self._slots.locked() and self.waiting >= self.max_waiting
+
+    @asynccontextmanager
+    async def admit(self):
+        if self.saturated:
+            self.rejected += 1
+            raise Overloaded("Too many queued requests")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.wait_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise Overloaded(f"No capacity within {self.wait_timeout}s")
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "max_active": self.max_active,
+            "max_waiting": self.max_waiting,
+        }
+
+# --- SHARED STATE ---
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One router, one connection pool and one LLM client serve every request
+    llm = default_llm()
+    tracer.jsonl_path = os.getenv("TRACE_PATH")
+    app.state.speculate = int(os.getenv("SPECULATE", "0"))
+    app.state.router = RegistryRouter(
+        os.getenv("REGISTRY_PATH", "servers.json"), mode=os.getenv("ROUTER_MODE", "llm"), llm=llm,
+        health=HealthChecker(interval=float(os.getenv("HEALTH_INTERVAL_S", "15"))),
+    )
+    app.state.admission = AdmissionController(
+        max_active=int(os.getenv("MAX_ACTIVE_QUERIES", "16")),
+        max_waiting=int(os.getenv("MAX_QUEUED_QUERIES", "64")),
+        wait_timeout=float(os.getenv("QUEUE_TIMEOUT_S", "10")),
+    )
+    metadata_cache = ToolMetadataCache(persist_path=".mcp_metadata_cache.json")
+    async with app.state.router.health.monitor(app.state.router.urls), MCPConnectionPool(
+        max_per_url=app.state.admission.max_active, metadata_cache=metadata_cache, health=app.state.router.health,
+    ) as pool:
+        app.state.pool = pool
+        yield
+
+app = FastAPI(title="MCP Agent Service", lifespan=lifespan)
+
+class QueryRequest(BaseModel):
+    query: str
+    execution_mode: Optional[Literal["graph", "plan"]] = None
+
+def _execution_mode(request: QueryRequest) -> str:
+    return request.execution_mode or os.getenv("EXECUTION_MODE", "graph")
+
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+# --- ENDPOINTS ---
+
+@app.get("/")
+async def root():
+    return {
+        "status": "active",
+        "service": "MCP Agent Service",
+        "endpoints": ["POST /query", "POST /query/stream", "GET /health", "GET /traces/stats", "GET /traces/otlp"],
+    }
+
+@app.get("/health")
+async def health():
+    return {
+        "admission": app.state.admission.stats(),
+        "route_cache": app.state.router.cache.stats(),
+        "servers": app.state.router.health.table(),
+    }
+
+@app.get("/traces/stats")
+async def trace_stats():
+    """p50/p95/p99 per stage over the most recent traces."""
+    return tracer.stats()
+
+@app.get("/traces/otlp")
+async def trace_otlp():
+    """The most recent traces as an OTLP/JSON export request."""
+    return tracer.to_otlp()
+
+@app.post("/query")
+async def query(request: QueryRequest):
+    """Answers a query and returns the full result once it is done."""
+    try:
+        async with app.state.admission.admit():
+            return await run_query(
+                request.query, app.state.router, app.state.pool, _execution_mode(request),
+                speculate=app.state.speculate,
+            )
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+@app.post("/query/stream")
+async def query_stream(request: QueryRequest):
+    """Streams the route decision, tool calls and results, answer tokens and answer as Server-Sent Events."""
+    admission = app.state.admission
+    if admission.saturated:
+        admission.rejected += 1
+        raise HTTPException(status_code=503, detail="Too many queued requests", headers={"Retry-After": "1"})
+
+    async def event_stream():
+        # The slot is taken inside the generator so it is always released with it
+        try:
+            async with admission.admit():
+                async for event in stream_query(
+                    request.query, app.state.router, app.state.pool, _execution_mode(request),
+                    stream_tokens=True, speculate=app.state.speculate,
+                ):
+                    yield _sse(event)
+        except Overloaded as e:
+            yield _sse({"type": "error", "error": str(e), "overloaded": True})
+        except Exception as e:
+            yield _sse({"type": "error", "error": describe_error(e)})
+        yield _sse({"type": "done"})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+if __name__ == "__main__":
+    print("🚀 Starting MCP Agent Service on http://127.0.0.1:8100")
+    print("📍 Docs:   http://127.0.0.1:8100/docs")
+    uvicorn.run(app, host="127.0.0.1", port=8100)
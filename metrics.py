@@ -0,0 +1,173 @@
+"""
+Minimal Prometheus metrics: counters, gauges and histograms rendered in the text
+exposition format, with no dependencies.
+
+    requests = registry.counter("http_requests_total", "HTTP requests.", ("route", "status"))
+    requests.inc(route="/add", status="200")
+    print(registry.render())
+
+Updates are a dict lookup and an addition under a lock, cheap enough to leave on in
+production. Label values should come from a small fixed set (route templates, tool
+names), never from raw user input.
+"""
+import asyncio
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)) + "}"
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), const_labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.const_labels = dict(const_labels or {})
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple([labels[n] for n in self.labels])
+
+    def _label_names(self) -> Tuple[str, ...]:
+        return (*self.const_labels, *self.labels)
+
+    def _label_values(self, key: Tuple[str, ...]) -> Tuple[str, ...]:
+        return (*self.const_labels.values(), *key)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+class Counter(_Metric):
+    """A value that only goes up."""
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        names = self._label_names()
+        return [f"{self.name}{_labels(names, self._label_values(k))} {_number(v)}" for k, v in sorted(self._values.items())]
+
+class Gauge(Counter):
+    """A value that goes up and down."""
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, plus their sum and count."""
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1][0] += value
+
+    def samples(self) -> List[str]:
+        names = self._label_names()
+        lines = []
+        for key, (counts, total) in sorted(self._values.items()):
+            values = self._label_values(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels((*names, 'le'), (*values, _number(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(names, values)} {_number(total[0])}")
+            lines.append(f"{self.name}_count{_labels(names, values)} {cumulative}")
+        return lines
+
+class Registry:
+    """Every metric of one process; const_labels (e.g. a worker id) are added to all of them."""
+    def __init__(self, const_labels: Optional[Dict[str, str]] = None):
+        self.const_labels = const_labels or {}
+        self._metrics: List[_Metric] = []
+
+    def _add(self, metric: _Metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels, self.const_labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels, self.const_labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, self.const_labels, buckets=buckets))
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics) + "\n"
+
+def merge(expositions: Iterable[str]) -> str:
+    """
+    Combines the /metrics output of several processes into one exposition: each
+    metric's HELP and TYPE once, followed by every process's samples. The processes
+    must label their samples apart (e.g. with a worker label).
+    """
+    families: Dict[str, List[str]] = {}
+    current: List[str] = []
+    for text in expositions:
+        for line in text.splitlines():
+            if line.startswith("# HELP "):
+                name = line.split(" ", 3)[2]
+                current = families.setdefault(name, [])
+                if not current:
+                    current.append(line)
+            elif line.startswith("# TYPE "):
+                if len(current) == 1:
+                    current.append(line)
+            elif line:
+                current.append(line)
+    return "\n".join(line for lines in families.values() for line in lines) + "\n"
+
+async def monitor_event_loop_lag(histogram: Histogram, interval: float = 0.5):
+    """Measures how late the event loop wakes up from a sleep; run it as a background task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        histogram.observe(max(0.0, loop.time() - start - interval))
@@ -0,0 +1,121 @@
+"""Plan-once execution: the LLM emits a whole tool-call DAG, executed locally without further LLM calls."""
+import asyncio
+import re
+from graphlib import CycleError, TopologicalSorter
+from typing import Dict, List, Union, get_args
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+
+_REF_RE = re.compile(r"^\$(\w+)$")
+
+class PlanStep(BaseModel):
+    """One tool call in the plan."""
+    id: str = Field(..., description="Unique step id, e.g. 's1'.")
+    tool: str = Field(..., description="Name of the tool to call.")
+    args: Dict[str, Union[float, int, bool, str, List[float]]] = Field(
+        ..., description="Tool arguments; list parameters take a list of numbers. Use the string '$<step id>' to pass an earlier step's result."
+    )
+
+class ToolPlan(BaseModel):
+    """The complete list of tool calls needed to answer the request."""
+    steps: List[PlanStep] = Field(..., description="Every tool call, in any order; dependencies are inferred from '$' references.")
+
+class PlanError(ValueError):
+    """The plan cannot be executed as written."""
+
+PLANNER_PROMPT = (
+    "You are a planner. Break the user's request into calls to the tools below and "
+    "return ALL of them at once as a plan. A step can use the result of an earlier step "
+    "by passing the string '$<step id>' as an argument value. Steps that do not depend on "
+    "each other run in parallel.\n\nTools:\n{tools}"
+)
+
+def _type_name(annotation) -> str:
+    # List[float] must not be shortened to "List", or the planner cannot know what goes in it
+    return repr(annotation).replace("typing.", "") if get_args(annotation) else annotation.__name__
+
+def describe_tools(tools: List[BaseTool]) -> str:
+    lines = []
+    for t in tools:
+        params = ", ".join(
+            f"{name}: {_type_name(field.annotation)}" for name, field in t.args_schema.model_fields.items()
+        )
+        lines.append(f"- {t.name}({params}): {t.description}")
+    return "\n".join(lines)
+
+def _references(step: PlanStep) -> List[str]:
+    return [m.group(1) for v in step.args.values() if isinstance(v, str) and (m := _REF_RE.match(v))]
+
+def dependency_graph(plan: ToolPlan, tools_by_name: Dict[str, BaseTool]) -> Dict[str, set]:
+    """Validates the plan and returns {step id: ids it depends on}."""
+    ids = [s.id for s in plan.steps]
+    if not ids:
+        raise PlanError("Plan has no steps")
+    if len(set(ids)) != len(ids):
+        raise PlanError("Plan step ids are not unique")
+    graph = {}
+    for step in plan.steps:
+        if step.tool not in tools_by_name:
+            raise PlanError(f"Step '{step.id}' uses unknown tool '{step.tool}'")
+        deps = set(_references(step))
+        if unknown := deps - set(ids):
+            raise PlanError(f"Step '{step.id}' references unknown steps {sorted(unknown)}")
+        graph[step.id] = deps
+    try:
+        TopologicalSorter(graph).prepare()
+    except CycleError as e:
+        raise PlanError(f"Plan has a dependency cycle: {e.args[1]}") from e
+    return graph
+
+async def execute_plan(plan: ToolPlan, tools: List[BaseTool], config: dict) -> Dict[str, dict]:
+    """
+    Runs every step as soon as its dependencies finish, independent steps concurrently.
+    Returns {step id: {"args": resolved args, "result": text}}; failures are recorded as
+    results so the final answer can explain them.
+    """
+    tools_by_name = {t.name: t for t in tools}
+    steps = {s.id: s for s in plan.steps}
+    sorter = TopologicalSorter(dependency_graph(plan, tools_by_name))
+    sorter.prepare()
+    outcomes: Dict[str, dict] = {}
+    failed = set()
+
+    async def run(step: PlanStep):
+        if broken := [d for d in _references(step) if d in failed]:
+            failed.add(step.id)
+            return {"args": dict(step.args), "result": f"Error: skipped because step(s) {broken} failed"}
+        args = {
+            k: outcomes[m.group(1)]["result"] if isinstance(v, str) and (m := _REF_RE.match(v)) else v
+            for k, v in step.args.items()
+        }
+        try:
+            result = await tools_by_name[step.tool].ainvoke(args, config=config)
+        except Exception as e:
+            failed.add(step.id)
+            result = f"Error: {e}"
+        return {"args": args, "result": str(result)}
+
+    pending: Dict[asyncio.Task, str] = {}
+    while sorter.is_active():
+        for step_id in sorter.get_ready():
+            pending[asyncio.create_task(run(steps[step_id]))] = step_id
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            step_id = pending.pop(task)
+            outcomes[step_id] = task.result()
+            sorter.done(step_id)
+    return outcomes
+
+def transcript(plan: ToolPlan, outcomes: Dict[str, dict]) -> list:
+    """The executed plan as a regular tool-call exchange, in plan order, for the final LLM call."""
+    calls = [
+        {"name": s.tool, "args": outcomes[s.id]["args"], "id": f"plan_{s.id}"}
+        for s in plan.steps
+    ]
+    results = [
+        ToolMessage(content=outcomes[s.id]["result"], tool_call_id=f"plan_{s.id}")
+        for s in plan.steps
+    ]
+    return [AIMessage(content="", tool_calls=calls), *results]
@@ -0,0 +1,206 @@
+"""Local routing engines that score registry servers without calling an LLM."""
+import re
+import time
+import zlib
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+_SPACE_RE = re.compile(r"\s+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "any", "are", "as", "at", "be", "by", "can", "do", "for",
+    "from", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "please",
+    "the", "to", "what", "with", "you",
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens with CamelCase split; stopwords and bare numbers dropped."""
+    text = _CAMEL_RE.sub(" ", text).lower()
+    return [
+        w for w in _WORD_RE.findall(text)
+        if w not in _STOPWORDS and not w.isdigit()
+    ]
+
+
+def fingerprint(query: str) -> str:
+    """Canonical form of a query for cache lookups: case, spacing and numbers folded."""
+    text = _NUMBER_RE.sub("<num>", query.lower())
+    return _SPACE_RE.sub(" ", text).strip(" ?!.")
+
+
+@lru_cache(maxsize=65536)
+def _word_features(word: str) -> Tuple[str, ...]:
+    # Trigrams let "add" match "addition" and "multiply" match "multiplication"
+    padded = f"<{word}>"
+    return (word, *(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2)))
+
+
+def features(text: str) -> List[str]:
+    """Word tokens, each followed by its character trigrams."""
+    return [feat for word in tokenize(text) for feat in _word_features(word)]
+
+
+class HashingEmbedder:
+    """Hashes words and character trigrams into a fixed-size sparse feature space."""
+    def __init__(self, dim: int = 4096):
+        self.dim = dim
+
+    def features(self, text: str) -> List[str]:
+        return features(text)
+
+    def counts(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for feat in self.features(text):
+            # crc32 is stable across processes, unlike the salted built-in hash()
+            vec[zlib.crc32(feat.encode()) % self.dim] += 1.0
+        return vec
+
+
+class EmbeddingIndex:
+    """TF-IDF vectors of server descriptions, scored against queries by cosine similarity."""
+    def __init__(self, servers: List[dict], embedder: HashingEmbedder = None):
+        self.servers = servers
+        self.embedder = embedder or HashingEmbedder()
+        docs = [f"{s['name']} {s['description']}" for s in servers]
+        counts = np.stack([self.embedder.counts(d) for d in docs]) if docs else \
+            np.zeros((0, self.embedder.dim), dtype=np.float32)
+
+        n_docs = len(docs)
+        df = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + n_docs) / (1 + df)) + 1.0).astype(np.float32)
+        self.matrix = self._normalize(counts * self.idf)
+
+    @staticmethod
+    def _normalize(m: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(m, axis=-1, keepdims=True)
+        return m / np.where(norms == 0, 1.0, norms)
+
+    def scores(self, query: str) -> np.ndarray:
+        """Cosine similarity of the query against every server, in registry order."""
+        vec = self._normalize(self.embedder.counts(query) * self.idf)
+        return self.matrix @ vec
+
+    def ranked(self, query: str, exclude: Iterable[int] = (), limit: int = 3) -> List[Tuple[int, float]]:
+        """(index, score) of the `limit` most similar servers not in exclude, best first."""
+        scores = self.scores(query)
+        scores[list(exclude)] = -np.inf
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [(int(i), float(scores[i])) for i in order if scores[i] != -np.inf]
+
+
+class BM25Index:
+    """
+    Inverted index over server names and descriptions, scored with Okapi BM25.
+
+    Each feature's posting list holds the servers containing it and their precomputed
+    BM25 weight, so a query only touches the postings of its own features. Trigrams
+    found in more than max_trigram_df of the servers (and at least 100) are not
+    indexed: they say little about any one server and their postings would dominate
+    query time on large registries.
+    """
+    def __init__(self, servers: List[dict], k1: float = 1.2, b: float = 0.75, max_trigram_df: float = 0.01):
+        self.servers = servers
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        lengths = np.zeros(len(servers), dtype=np.float32)
+        for i, s in enumerate(servers):
+            counts = Counter(features(f"{s['name']} {s['description']}"))
+            lengths[i] = sum(counts.values())
+            for feat, tf in counts.items():
+                ids, tfs = postings.setdefault(feat, ([], []))
+                ids.append(i)
+                tfs.append(tf)
+
+        n_docs = len(servers)
+        norm = k1 * (1 - b + b * lengths / (lengths.mean() if n_docs else 1.0))
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        max_df = max(100, max_trigram_df * n_docs)
+        for feat, (ids, tfs) in postings.items():
+            if feat[0] == "#" and len(ids) > max_df:
+                continue
+            ids = np.asarray(ids, dtype=np.int32)
+            tf = np.asarray(tfs, dtype=np.float32)
+            idf = np.log(1 + (n_docs - len(ids) + 0.5) / (len(ids) + 0.5))
+            self.postings[feat] = (ids, (idf * tf * (k1 + 1) / (tf + norm[ids])).astype(np.float32))
+
+    def __len__(self) -> int:
+        return len(self.servers)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of the query against every server, in registry order."""
+        scores = np.zeros(len(self.servers), dtype=np.float32)
+        for feat, qtf in Counter(features(query)).items():
+            posting = self.postings.get(feat)
+            if posting is not None:
+                ids, weights = posting
+                scores[ids] += qtf * weights  # ids are unique within a posting list
+        return scores
+
+    def ranked(self, query: str, exclude: Iterable[int] = (), limit: int = 20) -> List[Tuple[int, float]]:
+        """(index, score) of the `limit` best matching servers not in exclude, best first; no zero scores."""
+        scores = self.scores(query)
+        scores[list(exclude)] = 0.0
+        # Partition only the servers that matched at all, usually a small fraction
+        matched = np.flatnonzero(scores > 0)
+        if limit < len(matched):
+            matched = matched[np.argpartition(-scores[matched], limit)[:limit]]
+        top = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top]
+
+
+class RouteCache:
+    """LRU cache of routing decisions with a TTL, negative caching and hit/miss counters."""
+    MISS = object()
+
+    def __init__(self, max_size: int = 1024, ttl: float = 600.0, negative_ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Returns the cached value, or RouteCache.MISS (None is a valid cached route)."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return self.MISS
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, value: Any, negative: bool = False):
+        """Stores a value; negative results expire after the shorter negative_ttl."""
+        if self.max_size <= 0:
+            return
+        ttl = self.negative_ttl if negative else self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,16 +1,145 @@
-from fastapi import FastAPI, HTTPException
+import argparse
+import ast
+import asyncio
+import math
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+from contextlib import asynccontextmanager, suppress
+from functools import lru_cache
+from time import perf_counter
+from typing import Dict, List, Literal, Tuple, Union
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+import httpx
 from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
+import numpy as np
+from pydantic import BaseModel, ValidationError
+from pydantic_core import to_json
 from starlette.middleware.cors import CORSMiddleware
 import uvicorn
 
+from metrics import CONTENT_TYPE, Registry, merge, monitor_event_loop_lag
+
+# Set in each process launched by `python server.py --workers N`: that worker's index
+WORKER = os.getenv("MATH_SERVER_WORKER")
+
+# --- METRICS ---
+# Served at /metrics in the Prometheus text format. Label values are route templates,
+# tool names and fixed error reasons, so the number of series stays bounded.
+# In multi-worker mode every series carries its worker's index.
+registry = Registry({"worker": WORKER} if WORKER is not None else None)
+HTTP_REQUESTS = registry.counter("http_requests_total", "HTTP requests, by route template and status code.", ("method", "route", "status"))
+HTTP_DURATION = registry.histogram("http_request_duration_seconds", "Time to answer an HTTP request; SSE streams are not timed.", ("route",))
+TOOL_CALLS = registry.counter("mcp_tool_calls_total", "MCP tool calls, over SSE and Streamable HTTP.", ("tool", "status"))
+TOOL_DURATION = registry.histogram("mcp_tool_duration_seconds", "MCP tool call duration.", ("tool",))
+ARITHMETIC_ERRORS = registry.counter("arithmetic_errors_total", "Operations that could not be computed, over REST and MCP.", ("operation", "reason"))
+SSE_CONNECTIONS = registry.gauge("mcp_sse_connections", "Open MCP SSE streams.")
+SSE_CONNECTIONS.set(0)
+LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds", "How late the event loop runs a task that is due; high values mean blocking work.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+_METHODS = {"GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"}
+
+class MetricsMiddleware:
+    """Counts and times every HTTP request; a pure ASGI middleware, so it adds a few microseconds at most."""
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route(scope) -> str:
+        # FastAPI routes record themselves in the scope; the MCP transports are Starlette routes
+        if "route" in scope:
+            return scope["route"].path
+        path = scope["path"]
+        if path.startswith("/messages/"):
+            return "/messages/"
+        return path if path in ("/sse", "/mcp") else "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status = 500
+
+        async def send_and_record_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stream = scope["path"] == "/sse"
+        if stream:
+            SSE_CONNECTIONS.inc()
+        try:
+            await self.app(scope, receive, send_and_record_status)
+        finally:
+            if stream:
+                SSE_CONNECTIONS.dec()
+            route = self._route(scope)
+            # Any token is a valid method to the HTTP parser: unknown ones share one label
+            method = scope["method"] if scope["method"] in _METHODS else "other"
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+            if not stream:
+                HTTP_DURATION.observe(perf_counter() - start, route=route)
+
+class InstrumentedFastMCP(FastMCP):
+    """FastMCP that counts and times every tool call, whichever transport it came over."""
+    async def call_tool(self, name, arguments):
+        # Unknown names come from clients: keep them out of the labels
+        tool = name if self._tool_manager.get_tool(name) is not None else "unknown"
+        start = perf_counter()
+        status = "error"
+        try:
+            result = await super().call_tool(name, arguments)
+            status = "ok"
+            return result
+        finally:
+            TOOL_CALLS.inc(tool=tool, status=status)
+            TOOL_DURATION.observe(perf_counter() - start, tool=tool)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Mounted apps get no lifespan of their own: the Streamable HTTP session manager
+    # has to be started here, before the first /mcp request.
+    async with mcp.session_manager.run():
+        lag_monitor = asyncio.create_task(monitor_event_loop_lag(LOOP_LAG))
+        try:
+            yield
+        finally:
+            lag_monitor.cancel()
+
 # 1. Create the FastAPI application
-app = FastAPI(title="Math Hybrid Server")
+app = FastAPI(title="Math Hybrid Server", lifespan=lifespan)
+# Added first so it sits inside SessionAffinityMiddleware: a forwarded message is
+# counted once, by the worker that handles it
+app.add_middleware(MetricsMiddleware)
 
 # 2. Create the MCP server
-# We'll use this to register tools and prompts for the MCP protocol
-mcp = FastMCP("MathServer")
+# We'll use this to register tools and prompts for the MCP protocol.
+# Streamable HTTP runs stateless with plain JSON responses: every request stands on its
+# own, so any worker or replica can answer it. SSE sessions stay in the process that opened them.
+# In multi-worker mode each worker's SSE sessions post to /messages/<worker>/, so any
+# worker can tell which process holds a session.
+mcp = InstrumentedFastMCP(
+    "MathServer", stateless_http=True, json_response=True,
+    message_path=f"/messages/{WORKER}/" if WORKER is not None else "/messages/",
+)
 
 # --- SHARED LOGIC ---
+# Scalars or NumPy arrays: the batch endpoints run the same functions over whole arrays.
+
+DIVIDE_BY_ZERO = "Cannot divide by zero"
 
 def do_add(a: float, b: float) -> float:
     return a + b
@@ -23,32 +152,183 @@ def do_multiply(a: float, b: float) -> float:
 
 def do_divide(a: float, b: float) -> float:
     if b == 0:
-        raise ValueError("Cannot divide by zero")
+        ARITHMETIC_ERRORS.inc(operation="divide", reason="divide_by_zero")
+        raise ValueError(DIVIDE_BY_ZERO)
     return a / b
 
+OPERATIONS = {"add": do_add, "subtract": do_subtract, "multiply": do_multiply, "divide": do_divide}
+# do_batch masks out zero divisors itself, so arrays go straight to the ufuncs
+_ARRAY_OPERATIONS = {"add": np.add, "subtract": np.subtract, "multiply": np.multiply, "divide": np.divide}
+Operation = Literal["add", "subtract", "multiply", "divide"]
+Operands = Union[float, List[float]]
+
+def do_batch(operation: str, a: Operands, b: Operands) -> Tuple[List[float], List[dict]]:
+    """
+    Applies an operation element-wise, broadcasting a scalar against an array.
+    Elements that cannot be computed (division by zero, overflow) are None in the
+    results and listed in the errors, instead of failing the whole batch.
+    """
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+    if a.ndim != 1:
+        a, b = a.reshape(-1), b.reshape(-1)
+    results = np.full(a.shape, np.nan)
+    failed: Dict[int, str] = {}
+    valid = np.ones(a.shape, dtype=bool)
+    if operation == "divide":
+        valid = b != 0
+        failed.update((int(i), DIVIDE_BY_ZERO) for i in np.flatnonzero(~valid))
+        if failed:
+            ARITHMETIC_ERRORS.inc(len(failed), operation="divide", reason="divide_by_zero")
+    with np.errstate(over="ignore", invalid="ignore"):
+        results[valid] = _ARRAY_OPERATIONS[operation](a[valid], b[valid])
+    # JSON has no inf or nan, so results that overflowed are reported like any other failure
+    not_finite = np.flatnonzero(valid & ~np.isfinite(results))
+    for i in not_finite:
+        failed[int(i)] = "Result is not a finite number"
+    if len(not_finite):
+        ARITHMETIC_ERRORS.inc(len(not_finite), operation=operation, reason="not_finite")
+
+    out = results.tolist()
+    for i in failed:
+        out[i] = None
+    return out, [{"index": i, "error": failed[i]} for i in sorted(failed)]
+
+# Expressions are parsed with ast and walked node by node; nothing is ever eval()'d.
+# Only numbers, + - * / and parentheses are accepted.
+MAX_EXPRESSION_LENGTH = 1000
+# Validation and evaluation recurse once per level of nesting (parentheses on the right
+# of an operator, unary signs); this keeps both far from Python's recursion limit, which
+# "-" * 998 + "1" would otherwise reach within the length limit. Chains such as
+# 1 + 2 + 3, which ast nests to the left, are walked in a loop and do not count.
+MAX_EXPRESSION_DEPTH = 200
+_BINARY_OPERATIONS = {ast.Add: "add", ast.Sub: "subtract", ast.Mult: "multiply", ast.Div: "divide"}
+
+def _left_chain(node: ast.expr) -> Tuple[ast.expr, List[ast.BinOp]]:
+    """Splits a ((a op b) op c) ... chain into its leftmost operand and its operations, first one first."""
+    chain = []
+    while isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATIONS:
+        chain.append(node)
+        node = node.left
+    return node, chain[::-1]
+
+def _check_node(node: ast.expr, depth: int = 1):
+    if depth > MAX_EXPRESSION_DEPTH:
+        raise ValueError(f"Expression is nested more than {MAX_EXPRESSION_DEPTH} levels deep")
+    node, chain = _left_chain(node)
+    for operation in chain:
+        _check_node(operation.right, depth + 1)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        _check_node(node.operand, depth + 1)
+    elif isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        # 1e400 parses to inf, and a long enough integer cannot be converted at all
+        try:
+            finite = math.isfinite(node.value)
+        except OverflowError:
+            finite = False
+        if not finite:
+            raise ValueError("Number too large in expression")
+    else:
+        raise ValueError(f"Unsupported syntax in expression: {ast.unparse(node)!r}")
+
+@lru_cache(maxsize=1024)
+def parse_expression(expression: str) -> ast.expr:
+    """Parses and validates an arithmetic expression; repeated expressions come from the cache."""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except (SyntaxError, RecursionError, MemoryError) as e:
+        raise ValueError(f"Invalid expression: {e.msg if isinstance(e, SyntaxError) else 'too deeply nested'}")
+    _check_node(tree.body)
+    return tree.body
+
+def do_evaluate(expression: str) -> Tuple[float, List[dict]]:
+    """Evaluates an expression with the do_* functions; returns the result and every step taken."""
+    steps: List[dict] = []
+
+    def visit(node: ast.expr) -> float:
+        if isinstance(node, ast.Constant):
+            return float(node.value)
+        if isinstance(node, ast.UnaryOp):
+            value = visit(node.operand)
+            return -value if isinstance(node.op, ast.USub) else value
+        node, chain = _left_chain(node)
+        result = visit(node)
+        for link in chain:
+            operation = _BINARY_OPERATIONS[type(link.op)]
+            a, b = result, visit(link.right)
+            result = OPERATIONS[operation](a, b)
+            if not math.isfinite(result):
+                ARITHMETIC_ERRORS.inc(operation=operation, reason="not_finite")
+                raise ValueError(f"Result of {operation}({a}, {b}) is not a finite number")
+            steps.append({"operation": operation, "a": a, "b": b, "result": result})
+        return result
+
+    try:
+        tree = parse_expression(expression)
+    except ValueError:
+        ARITHMETIC_ERRORS.inc(operation="evaluate", reason="invalid_expression")
+        raise
+    return visit(tree), steps
+
 # --- MCP TOOLS ---
 # These are exposed to the MCP-capable agents (like agent.py)
+# readOnlyHint tells agents the calls have no side effects, so they may run in parallel.
+PURE = ToolAnnotations(readOnlyHint=True)
 
-@mcp.tool()
+@mcp.tool(annotations=PURE)
 def add(a: float, b: float) -> float:
     """Add two numbers."""
     return do_add(a, b)
 
-@mcp.tool()
+@mcp.tool(annotations=PURE)
 def subtract(a: float, b: float) -> float:
     """Subtract b from a."""
     return do_subtract(a, b)
 
-@mcp.tool()
+@mcp.tool(annotations=PURE)
 def multiply(a: float, b: float) -> float:
     """Multiply two numbers."""
     return do_multiply(a, b)
 
-@mcp.tool()
+@mcp.tool(annotations=PURE)
 def divide(a: float, b: float) -> float:
     """Divide a by b. Raises error if b is zero."""
     return do_divide(a, b)
 
+@mcp.tool(annotations=PURE)
+def batch_add(a: List[float], b: List[float]) -> dict:
+    """Add two lists element-wise; a one-element list is added to every element of the other."""
+    results, errors = do_batch("add", a, b)
+    return {"results": results, "errors": errors}
+
+@mcp.tool(annotations=PURE)
+def batch_subtract(a: List[float], b: List[float]) -> dict:
+    """Subtract list b from list a element-wise; a one-element list is broadcast to the other's length."""
+    results, errors = do_batch("subtract", a, b)
+    return {"results": results, "errors": errors}
+
+@mcp.tool(annotations=PURE)
+def batch_multiply(a: List[float], b: List[float]) -> dict:
+    """Multiply two lists element-wise; a one-element list multiplies every element of the other."""
+    results, errors = do_batch("multiply", a, b)
+    return {"results": results, "errors": errors}
+
+@mcp.tool(annotations=PURE)
+def batch_divide(a: List[float], b: List[float]) -> dict:
+    """Divide list a by list b element-wise. Division by zero is reported per element in errors."""
+    results, errors = do_batch("divide", a, b)
+    return {"results": results, "errors": errors}
+
+@mcp.tool(annotations=PURE)
+def evaluate(expression: str) -> dict:
+    """
+    Evaluate a whole arithmetic expression in one call, e.g. "(3 + 4) * 2 / 7".
+    Supports numbers, + - * / and parentheses. Returns the result and each step taken.
+    """
+    result, steps = do_evaluate(expression)
+    return {"result": result, "steps": steps}
+
 # --- MCP PROMPTS ---
 
 @mcp.prompt()
@@ -56,9 +336,10 @@ def math_assistant_instructions() -> str:
     """Instructional prompt for the math assistant."""
     return (
         "You are a helpful mathematical assistant. "
-        "IMPORTANT: You must perform calculations STEP-BY-STEP. "
-        "Wait for the result of one tool call before starting the next. "
-        "Do not attempt to call multiple tools in parallel for a single equation. "
+        "Use the tools for every calculation. For an expression with more than one "
+        "operation, call evaluate once with the whole expression. Otherwise, independent "
+        "operations (for example both sides of a product) can be requested in the same turn; "
+        "wait for their results before starting operations that need them. "
         "Use the result of your previous tool calls to build the final answer."
     )
 
@@ -70,7 +351,7 @@ async def root():
     return {
         "status": "active", 
         "service": "Math Hybrid Server",
-        "capabilities": ["MCP (SSE)", "REST (JSON)"]
+        "capabilities": ["MCP (SSE)", "MCP (Streamable HTTP)", "REST (JSON)"]
     }
 
 @app.get("/add")
@@ -92,21 +373,209 @@ async def rest_divide(a: float, b: float):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-# --- MOUNT MCP SSE ---
+class BatchRequest(BaseModel):
+    a: Operands
+    b: Operands
+
+def _batch_response(operation: str, batch: BatchRequest) -> bytes:
+    results, errors = do_batch(operation, batch.a, batch.b)
+    return to_json({"operation": operation, "count": len(results), "results": results, "errors": errors})
+
+# The body is parsed and the response encoded by pydantic's JSON codec rather than
+# FastAPI's json.loads + validation + encoder: several times faster on large arrays.
+# The schema is declared by hand so /docs still shows it.
+@app.post("/batch/{operation}", openapi_extra={"requestBody": {
+    "required": True, "content": {"application/json": {"schema": BatchRequest.model_json_schema()}},
+}})
+async def rest_batch(operation: Operation, request: Request):
+    try:
+        batch = BatchRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    try:
+        # Off the event loop: a million elements take a few hundred ms
+        content = await run_in_threadpool(_batch_response, operation, batch)
+    except ValueError as e:  # operands of different lengths
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content, media_type="application/json")
+
+class EvaluateRequest(BaseModel):
+    expression: str
+
+@app.post("/evaluate")
+async def rest_evaluate(request: EvaluateRequest):
+    try:
+        result, steps = do_evaluate(request.expression)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"operation": "evaluate", "expression": request.expression, "result": result, "steps": steps}
+
+@app.get("/metrics")
+async def rest_metrics(local: bool = False):
+    """
+    Prometheus metrics. In multi-worker mode the worker answering the scrape collects
+    every other worker's metrics over their Unix sockets, unless local is set.
+    """
+    text = registry.render()
+    if WORKER is not None and not local:
+        port, workers = int(os.environ["MATH_SERVER_PORT"]), int(os.environ["MATH_SERVER_WORKERS"])
+        responses = await asyncio.gather(
+            *(worker_client(port, str(w)).get("/metrics", params={"local": "true"}) for w in range(workers) if str(w) != WORKER),
+            return_exceptions=True,
+        )
+        # A worker that does not answer is left out, as it would be with one scrape per worker
+        text = merge([text] + [r.text for r in responses if isinstance(r, httpx.Response) and r.status_code == 200])
+    return Response(text, media_type=CONTENT_TYPE)
+
+# --- MULTI-WORKER MODE ---
+
+def worker_socket_path(port: int, worker: str) -> str:
+    return os.path.join(tempfile.gettempdir(), f"math-server-{port}-{worker}.sock")
+
+_worker_clients: Dict[str, httpx.AsyncClient] = {}
+
+def worker_client(port: int, worker: str) -> httpx.AsyncClient:
+    """An HTTP client for another worker, over its Unix socket."""
+    if worker not in _worker_clients:
+        transport = httpx.AsyncHTTPTransport(uds=worker_socket_path(port, worker))
+        _worker_clients[worker] = httpx.AsyncClient(transport=transport, base_url="http://worker")
+    return _worker_clients[worker]
+
+_HOP_BY_HOP = {b"connection", b"keep-alive", b"transfer-encoding", b"content-length"}
+
+class SessionAffinityMiddleware:
+    """
+    Delivers each SSE session's POST /messages/<worker>/ to the worker holding the
+    session. Workers share the listening port and the kernel spreads connections
+    between them, so a session's messages often reach a different worker than its
+    event stream; those are forwarded over the owner's Unix socket.
+    """
+    def __init__(self, app, worker: str, port: int, workers: int):
+        self.app = app
+        self.worker = worker
+        self.port = port
+        # Only real workers are forwarded to: each gets a cached client
+        self.others = {str(w) for w in range(workers)} - {worker}
+
+    async def __call__(self, scope, receive, send):
+        parts = scope["path"].split("/") if scope["type"] == "http" else []  # ["", "messages", "<worker>", ""]
+        if len(parts) < 4 or parts[1] != "messages" or parts[2] == self.worker:
+            await self.app(scope, receive, send)
+            return
+
+        status, content, response_headers = 404, b"Could not find session", []
+        if parts[2] in self.others:
+            body, more = b"", True
+            while more:
+                message = await receive()
+                body += message.get("body", b"")
+                more = message.get("more_body", False)
+            # The Host header is kept: the MCP transport validates it
+            headers = [(k, v) for k, v in scope["headers"] if k not in _HOP_BY_HOP]
+            url = scope["path"] + (f"?{scope['query_string'].decode()}" if scope["query_string"] else "")
+            try:
+                response = await worker_client(self.port, parts[2]).request(scope["method"], url, headers=headers, content=body)
+                status, content = response.status_code, response.content
+                response_headers = [(k, v) for k, v in response.headers.raw if k.lower() not in _HOP_BY_HOP]
+            except httpx.TransportError:
+                pass  # The worker has exited, along with its sessions
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        await send({"type": "http.response.body", "body": content})
+
+if WORKER is not None:
+    app.add_middleware(
+        SessionAffinityMiddleware, worker=WORKER,
+        port=int(os.environ["MATH_SERVER_PORT"]), workers=int(os.environ["MATH_SERVER_WORKERS"]),
+    )
+
+def run_worker(host: str, port: int, log_level: str):
+    """Serves the shared port (SO_REUSEPORT) plus this worker's own Unix socket."""
+    shared = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    shared.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    shared.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    shared.bind((host, port))
+    path = worker_socket_path(port, WORKER)
+    with suppress(FileNotFoundError):
+        os.unlink(path)
+    private = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    private.bind(path)
+    # uvicorn re-raises the SIGTERM it shut down on; exit through the finally below
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit())
+    try:
+        uvicorn.Server(uvicorn.Config(app, log_level=log_level)).run(sockets=[shared, private])
+    finally:
+        with suppress(FileNotFoundError):
+            os.unlink(path)
+
+def serve_workers(host: str, port: int, workers: int, log_level: str):
+    """Runs `workers` server processes on one port until interrupted."""
+    if not hasattr(socket, "SO_REUSEPORT"):
+        sys.exit("[!] --workers needs SO_REUSEPORT (Linux); run a single worker instead")
+    # Workers share the port with anything else bound with SO_REUSEPORT, such as the
+    # workers of an earlier run, so make sure nothing is listening there yet
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            probe.bind((host, port))
+        except OSError as e:
+            sys.exit(f"[!] Cannot listen on {host}:{port}: {e}")
+    # Stop the workers on SIGTERM too, not only on Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit())
+    processes = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--host", host, "--port", str(port), "--log-level", log_level],
+            env={**os.environ, "MATH_SERVER_WORKER": str(i), "MATH_SERVER_PORT": str(port), "MATH_SERVER_WORKERS": str(workers)},
+        )
+        for i in range(workers)
+    ]
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in processes:
+            process.wait()
+
+# --- MOUNT MCP TRANSPORTS ---
+# Streamable HTTP is served at /mcp. Its route is added to the root app directly,
+# because a second mount at "/" would be shadowed by the SSE one below.
+app.router.routes.extend(mcp.streamable_http_app().routes)
+
 # We mount the MCP SSE app. In servers.json, the URL is http://127.0.0.1:8000/sse
 # Mounting internal MCP routes to the root app.
 app.mount("/", mcp.sse_app())
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Math Hybrid Server: REST + MCP (SSE and Streamable HTTP).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="server processes sharing the port; SSE sessions stay on the worker that opened them")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
         allow_methods=["*"],
         allow_headers=["*"],
     )
-    
-    print("🚀 Starting Hybrid Math Server on http://127.0.0.1:8000")
-    print("📍 REST API: http://127.0.0.1:8000/docs")
-    print("📍 MCP SSE:  http://127.0.0.1:8000/sse")
-    
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    if WORKER is not None:
+        run_worker(args.host, args.port, args.log_level)
+        sys.exit()
+
+    base = f"http://{args.host}:{args.port}"
+    print(f"🚀 Starting Hybrid Math Server on {base}" + (f" with {args.workers} workers" if args.workers > 1 else ""))
+    print(f"📍 REST API: {base}/docs")
+    print(f"📍 MCP SSE:  {base}/sse")
+    print(f"📍 MCP HTTP: {base}/mcp (stateless Streamable HTTP)")
+    print(f"📍 Metrics:  {base}/metrics")
+
+    if args.workers > 1:
+        serve_workers(args.host, args.port, args.workers, args.log_level)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port, log_level=args.log_level)
@@ -0,0 +1,93 @@
+"""A LangGraph tool node that runs a batch of tool calls concurrently where it is safe to."""
+import asyncio
+import re
+from typing import Iterable, List, Optional, Set
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+
+from tracing import span
+
+# "$2" as an argument value means "the result of the 2nd call in this batch"
+_BATCH_REF_RE = re.compile(r"^\$(\d+)$")
+
+PARALLEL_TOOLS_HINT = (
+    "You may call several tools in one turn when the calls do not depend on each other. "
+    "To use the result of the n-th call of the same turn, pass the string '$n' as the argument."
+)
+
+class ParallelToolNode:
+    """
+    Replaces ToolNode for LLMs bound with parallel tool calls.
+    A call waits for the calls whose results it references ('$n') and for reader/writer
+    ordering: calls to tools that are not read-only wait for every earlier call, and
+    read-only calls wait for earlier non-read-only ones. Everything else runs
+    concurrently, at most max_in_flight at a time. ToolMessages come back in call order.
+    """
+    def __init__(self, tools: List[BaseTool], read_only: Iterable[str] = (), max_in_flight: int = 4):
+        self.tools_by_name = {t.name: t for t in tools}
+        self.read_only = set(read_only)
+        self.max_in_flight = max_in_flight
+
+    def dependencies(self, tool_calls: List[dict]) -> List[Set[int]]:
+        """For each call, the indexes of earlier calls it must wait for."""
+        deps = []
+        for j, call in enumerate(tool_calls):
+            waits = {ref - 1 for ref in self._references(call) if 0 < ref <= j}
+            writes = call["name"] not in self.read_only
+            waits.update(
+                i for i in range(j)
+                if writes or tool_calls[i]["name"] not in self.read_only
+            )
+            deps.append(waits)
+        return deps
+
+    @staticmethod
+    def _references(call: dict) -> List[int]:
+        return [
+            int(m.group(1)) for v in call["args"].values()
+            if isinstance(v, str) and (m := _BATCH_REF_RE.match(v))
+        ]
+
+    async def __call__(self, state: dict, config: RunnableConfig) -> dict:
+        tool_calls = state["messages"][-1].tool_calls
+        deps = self.dependencies(tool_calls)
+        limit = asyncio.Semaphore(self.max_in_flight)
+
+        async def run(j: int) -> ToolMessage:
+            call = tool_calls[j]
+            earlier = {i + 1: await tasks[i] for i in sorted(deps[j])}
+            error = self._check(call, j, earlier)
+            if error:
+                return self._message(call, error, "error")
+            args = {
+                k: earlier[int(m.group(1))].content
+                if isinstance(v, str) and (m := _BATCH_REF_RE.match(v)) else v
+                for k, v in call["args"].items()
+            }
+            async with limit:
+                try:
+                    result = await self.tools_by_name[call["name"]].ainvoke(args, config=config)
+                except Exception as e:
+                    return self._message(call, f"Error: {e}", "error")
+            return self._message(call, str(result), "success")
+
+        with span("tools", calls=len(tool_calls)):
+            # All tasks exist before any of them runs, so run() can look up earlier ones
+            tasks = [asyncio.create_task(run(j)) for j in range(len(tool_calls))]
+            return {"messages": list(await asyncio.gather(*tasks))}
+
+    def _check(self, call: dict, j: int, earlier: dict) -> Optional[str]:
+        if call["name"] not in self.tools_by_name:
+            return f"Error: unknown tool '{call['name']}'"
+        refs = self._references(call)
+        if bad := [r for r in refs if not 0 < r <= j]:
+            return f"Error: '${bad[0]}' does not refer to an earlier call in this turn"
+        if failed := [r for r in refs if earlier[r].status == "error"]:
+            return f"Error: skipped because call {failed[0]} failed"
+        return None
+
+    @staticmethod
+    def _message(call: dict, content: str, status: str) -> ToolMessage:
+        return ToolMessage(content=content, name=call["name"], tool_call_id=call["id"], status=status)
@@ -0,0 +1,271 @@
+"""
+Lightweight per-query tracing: nested spans timed with a monotonic clock.
+
+    with tracer.trace("query", query=query) as t:
+        with span("route") as s:
+            ...
+            s.set("path", decision.path)
+    print(waterfall(t.to_dict()))
+
+Spans opened while no trace is active cost one ContextVar lookup and record nothing.
+Finished traces are kept in memory for p50/p95/p99 stage statistics, can be appended
+to a JSONL file as they finish, and convert to OTLP/JSON for OpenTelemetry collectors.
+
+    python tracing.py traces.jsonl [--otlp traces.otlp.json]
+"""
+import argparse
+import json
+import math
+import secrets
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+class Span:
+    """One timed stage of a trace."""
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "status", "attributes")
+
+    def __init__(self, name: str, parent_id: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "ok"
+        self.attributes = attributes
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+class _NoopSpan:
+    """Stands in for a Span when no trace is active."""
+    def set(self, key: str, value: Any):
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class Trace:
+    """All spans recorded while answering one query."""
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.trace_id = secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.name = name
+        self.attributes = attributes
+        self.status = "ok"
+        # Monotonic for durations; wall clock only to place the trace in time
+        self.start_unix_ns = time.time_ns()
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.spans: List[Span] = []
+
+    def to_dict(self) -> dict:
+        end_ns = self.end_ns or time.perf_counter_ns()
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "name": self.name,
+            "attributes": self.attributes,
+            "status": self.status,
+            "start_unix_ns": self.start_unix_ns,
+            "duration_ms": (end_ns - self.start_ns) / 1e6,
+            "spans": [
+                {
+                    "span_id": s.span_id,
+                    "parent_id": s.parent_id,
+                    "name": s.name,
+                    "offset_ms": (s.start_ns - self.start_ns) / 1e6,
+                    "duration_ms": (s.end_ns - s.start_ns) / 1e6,
+                    "status": s.status,
+                    "attributes": s.attributes,
+                }
+                for s in sorted(self.spans, key=lambda s: s.start_ns)
+            ],
+        }
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """Times the block as a child of the innermost open span of the current trace."""
+    trace = _current_trace.get()
+    if trace is None or trace.end_ns is not None:
+        yield _NOOP_SPAN
+        return
+    parent = _current_span.get()
+    s = Span(name, parent.span_id if parent else trace.span_id, attributes)
+    # set() rather than reset(token): async generators may exit in another context
+    _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        s.end_ns = time.perf_counter_ns()
+        _current_span.set(parent)
+        trace.spans.append(s)
+
+class Tracer:
+    """Collects finished traces and optionally appends each one to a JSONL file."""
+    def __init__(self, max_traces: int = 1000, jsonl_path: Optional[str] = None):
+        self.traces: Deque[Trace] = deque(maxlen=max_traces)
+        self.jsonl_path = jsonl_path
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any):
+        """Starts a new trace for the block; spans opened inside it, or in tasks it spawns, join it."""
+        trace = Trace(name, attributes)
+        outer_trace, outer_span = _current_trace.get(), _current_span.get()
+        _current_trace.set(trace)
+        _current_span.set(None)
+        try:
+            yield trace
+        except BaseException as e:
+            trace.status = "error"
+            trace.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            trace.end_ns = time.perf_counter_ns()
+            _current_trace.set(outer_trace)
+            _current_span.set(outer_span)
+            self._record(trace)
+
+    def _record(self, trace: Trace):
+        self.traces.append(trace)
+        if self.jsonl_path:
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace.to_dict(), default=str) + "\n")
+
+    def stats(self) -> Dict[str, dict]:
+        return stage_stats(t.to_dict() for t in self.traces)
+
+    def to_otlp(self) -> dict:
+        return to_otlp(t.to_dict() for t in self.traces)
+
+tracer = Tracer()
+
+# --- REPORTING (over trace dicts, so live traces and JSONL files share it) ---
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    # Nearest-rank: always an observed value, stable for small samples
+    return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+def stage_stats(traces: Iterable[dict]) -> Dict[str, dict]:
+    """Per-stage count, total time and p50/p95/p99 in milliseconds; "total" is the whole query."""
+    durations: Dict[str, List[float]] = {}
+    for trace in traces:
+        durations.setdefault("total", []).append(trace["duration_ms"])
+        for s in trace["spans"]:
+            durations.setdefault(s["name"], []).append(s["duration_ms"])
+    stats = {}
+    for name, values in durations.items():
+        values.sort()
+        stats[name] = {
+            "count": len(values),
+            "sum_ms": round(sum(values), 3),
+            "p50_ms": round(_percentile(values, 50), 3),
+            "p95_ms": round(_percentile(values, 95), 3),
+            "p99_ms": round(_percentile(values, 99), 3),
+        }
+    return stats
+
+def format_stats(stats: Dict[str, dict]) -> str:
+    lines = [f"{'stage':<14} | {'count':>6} | {'p50 ms':>9} | {'p95 ms':>9} | {'p99 ms':>9}", "-" * 58]
+    for name, s in sorted(stats.items(), key=lambda item: -item[1]["sum_ms"]):
+        lines.append(f"{name:<14} | {s['count']:>6} | {s['p50_ms']:>9.1f} | {s['p95_ms']:>9.1f} | {s['p99_ms']:>9.1f}")
+    return "\n".join(lines)
+
+def waterfall(trace: dict, width: int = 40) -> str:
+    """Renders one trace as an indented timeline, one row per span."""
+    total = trace["duration_ms"] or 1e-9
+    depth = {trace["span_id"]: 0}
+    lines = [f"trace {trace['trace_id']}  {trace['name']}  {trace['duration_ms']:.1f} ms"]
+    for s in trace["spans"]:
+        # Spans are sorted by start, so a parent is always seen before its children
+        depth[s["span_id"]] = depth.get(s["parent_id"], 0) + 1
+        label = "  " * (depth[s["span_id"]] - 1) + s["name"]
+        if "tool" in s["attributes"]:
+            label += f" {s['attributes']['tool']}"
+        start = int(s["offset_ms"] / total * width)
+        length = max(1, round(s["duration_ms"] / total * width))
+        bar = " " * start + "#" * min(length, width - start)
+        flag = "" if s["status"] == "ok" else " !"
+        lines.append(f"  {label:<24} {s['offset_ms']:>8.1f} {s['duration_ms']:>8.1f} ms |{bar:<{width}}|{flag}")
+    return "\n".join(lines)
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[dict]:
+    out = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            out.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            out.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            out.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            out.append({"key": key, "value": {"stringValue": str(value)}})
+    return out
+
+def _otlp_span(trace: dict, span_id: str, parent_id: str, name: str,
+               offset_ms: float, duration_ms: float, status: str, attributes: dict) -> dict:
+    start = trace["start_unix_ns"] + round(offset_ms * 1e6)
+    return {
+        "traceId": trace["trace_id"],
+        "spanId": span_id,
+        "parentSpanId": parent_id,
+        "name": name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(start),
+        "endTimeUnixNano": str(start + round(duration_ms * 1e6)),
+        "attributes": _otlp_attributes(attributes),
+        "status": {"code": 2 if status == "error" else 1},
+    }
+
+def to_otlp(traces: Iterable[dict]) -> dict:
+    """OTLP/JSON ExportTraceServiceRequest, accepted by any OpenTelemetry collector's /v1/traces."""
+    spans = []
+    for trace in traces:
+        spans.append(_otlp_span(
+            trace, trace["span_id"], "", trace["name"], 0.0,
+            trace["duration_ms"], trace["status"], trace["attributes"],
+        ))
+        for s in trace["spans"]:
+            spans.append(_otlp_span(
+                trace, s["span_id"], s["parent_id"], s["name"], s["offset_ms"],
+                s["duration_ms"], s["status"], s["attributes"],
+            ))
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": "mcp-routing-agent"})},
+            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": spans}],
+        }]
+    }
+
+def read_jsonl(path: str) -> List[dict]:
+    traces = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                traces.append(json.loads(line))
+    return traces
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize traces recorded with TRACE_PATH.")
+    parser.add_argument("path", help="JSONL file of traces")
+    parser.add_argument("--otlp", help="also write the traces as OTLP/JSON to this file")
+    args = parser.parse_args()
+
+    traces = read_jsonl(args.path)
+    print(f"[*] {len(traces)} traces from {args.path}\n")
+    print(format_stats(stage_stats(traces)))
+    if args.otlp:
+        with open(args.otlp, "w", encoding="utf-8") as f:
+            json.dump(to_otlp(traces), f)
+        print(f"\n[*] Wrote OTLP/JSON to {args.otlp}")
+
+if __name__ == "__main__":
+    main()